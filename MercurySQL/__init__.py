@@ -12,8 +12,10 @@ This package provides classes for interacting with a SQLite database, including:
 
 - Exp: Represents a query expression that can be used to construct complex queries.
 
+- AsyncDataBase: The asyncio version of DataBase, for using it inside an event loop.
+
 Please refer to the individual class documentation for more details.
 """
 
-from .gensql import DataBase, Table, set_driver
+from .gensql import DataBase, Table, AsyncDataBase, set_driver
 from . import drivers
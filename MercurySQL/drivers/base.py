@@ -1,4 +1,4 @@
-from typing import List, Union, Any
+from typing import List, Union, Any, Dict
 
 
 class BaseDriver:
@@ -19,6 +19,8 @@ class BaseDriver:
     dependencies = []   # just for hints about what dependencies are needed
     version = '0.0.0'
     payload = '?'
+    max_variables = 999  # the max number of bound parameters in one sql command
+    online_rebuild = False  # whether the `rebuild_*` gensql APIs are implemented (see `Table.setPrimaryKey()`)
 
     class Cursor:
         """
@@ -136,6 +138,44 @@ class BaseDriver:
                 pass
                 # return "SELECT name FROM sqlite_master WHERE type='table';"
 
+            @staticmethod
+            def get_catalog() -> str:
+                """
+                Get all column's informations of all the tables in the database, at once.
+                Each row starts with the table name, followed by the same fields as `get_all_columns()`, ordered by table and column position.
+
+                :return: The SQL statement to get the catalog of the database.
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return (
+                        "SELECT m.name, p.name, p.type FROM sqlite_master AS m "
+                        "JOIN pragma_table_info(m.name) AS p "
+                        "WHERE m.type = 'table' ORDER BY m.name, p.cid;"
+                    )
+                """
+                pass
+
+            @staticmethod
+            def schema_fingerprint() -> str:
+                """
+                Get a cheap value which changes whenever the schema (tables / columns, including a rename) changes. Used to check whether a cached catalog is still valid.
+
+                :return: The SQL statement to get the fingerprint, or an empty string if not supported (so the catalog is never cached).
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return (
+                        "SELECT (SELECT schema_version FROM pragma_schema_version), COUNT(*), TOTAL(LENGTH(sql)) "
+                        "FROM sqlite_master;"
+                    )
+                """
+                pass
+
             @staticmethod
             def get_all_columns(table_name: str) -> str:
                 """
@@ -181,6 +221,100 @@ class BaseDriver:
                 #     CREATE TABLE IF NOT EXISTS {table_name} ({column_name} {column_type} {'PRIMARY KEY' if primaryKey else ''})
                 # """
 
+            @staticmethod
+            def create_table(table_name: str, columns: List[tuple], primaryKey: str = None, autoIncrement=False) -> Union[str, List[str]]:
+                """
+                Create a table (if it does not exist) with all its columns, by one statement.
+
+                :param table_name: The name of the table to be created.
+                :type table_name: str
+                :param columns: The columns, in the form of `[(column_name, column_type), ...]`.
+                :type columns: List[tuple]
+                :param primaryKey: The name of the primary key column, if any.
+                :type primaryKey: str
+                :param autoIncrement: Whether the primary key is auto-incremented.
+                :type autoIncrement: bool
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    definitions = ", ".join(
+                        f"{name} {type_} PRIMARY KEY{' AUTOINCREMENT' if autoIncrement else ''}" if name == primaryKey else f"{name} {type_}"
+                        for name, type_ in columns
+                    )
+                    return f"CREATE TABLE IF NOT EXISTS {table_name} ({definitions})"
+
+                """
+                pass
+
+            @staticmethod
+            def create_index(index_name: str, table_name: str, columns: str, unique=False, where: str = "") -> str:
+                """
+                Create an index on a table (if it does not exist).
+
+                :param index_name: The name of the index.
+                :type index_name: str
+                :param table_name: The name of the table.
+                :type table_name: str
+                :param columns: The columns of the index, seperated by ','.
+                :type columns: str
+                :param unique: Whether it's a unique index.
+                :type unique: bool
+                :param where: The condition of a partial index, values are inlined. Empty if not partial.
+                :type where: str
+
+                .. note:: Raise `NotSupportedError` if partial indexes are not supported by the database.
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns}){f' WHERE {where}' if where else ''}"
+
+                """
+                pass
+
+            @staticmethod
+            def drop_index(index_name: str, table_name: str) -> str:
+                """
+                Drop an index of a table.
+
+                :param index_name: The name of the index.
+                :type index_name: str
+                :param table_name: The name of the table.
+                :type table_name: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"DROP INDEX IF EXISTS {index_name}"
+
+                """
+                pass
+
+            @staticmethod
+            def get_indexes(table_name: str) -> str:
+                """
+                Get all the indexes of a table, which can be dropped by `drop_index()`. So the ones made for the primary key / `UNIQUE` constraints (E.g., `sqlite_autoindex_*`) are left out.
+                Each row is `(index_name, unique, partial, column_name)`, one row for each column of an index, ordered by the index and the column position.
+
+                :param table_name: The name of the table.
+                :type table_name: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return (
+                        f"SELECT il.name, il.[unique], il.partial, ii.name FROM pragma_index_list('{table_name}') AS il "
+                        f"JOIN pragma_index_info(il.name) AS ii WHERE il.origin = 'c' ORDER BY il.name, ii.seqno;"
+                    )
+
+                """
+                pass
+
             @staticmethod
             def add_column(table_name: str, column_name: str, column_type: str) -> Union[str, List[str]]:
                 """
@@ -263,6 +397,298 @@ class BaseDriver:
                 #     f"ALTER TABLE new_table RENAME TO {table.table_name}"
                 # ]
 
+            # Online rebuild, only needed if `online_rebuild` is True.
+            # The rows are copied into `new_table` chunk by chunk, while triggers on the old table copy the concurrent writes.
+
+            @staticmethod
+            def get_primary_key(table_name: str) -> str:
+                """
+                Get the primary key column(s) of a table, one row for each column, in order.
+
+                :param table_name: The name of the table.
+                :type table_name: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"SELECT name FROM pragma_table_info('{table_name}') WHERE pk > 0 ORDER BY pk;"
+
+                """
+                pass
+
+            @staticmethod
+            def get_index_sql(table_name: str) -> str:
+                """
+                Get the `(name, sql)` of the indexes of a table, which have to be created again after the table is rebuilt.
+
+                :param table_name: The name of the table.
+                :type table_name: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = '{table_name}' AND sql IS NOT NULL;"
+
+                """
+                pass
+
+            @staticmethod
+            def get_trigger_sql(table_name: str) -> str:
+                """
+                Get the `(name, sql)` of the triggers on a table (except the ones of a rebuild), which have to be created again after the table is rebuilt.
+
+                :param table_name: The name of the table.
+                :type table_name: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = '{table_name}' AND name NOT GLOB '___rebuild_*';"
+
+                """
+                pass
+
+            @staticmethod
+            def get_view_sql() -> str:
+                """
+                Get the `(name, sql)` of all the views, to check whether they use a column removed by a rebuild.
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return "SELECT name, sql FROM sqlite_master WHERE type = 'view';"
+
+                """
+                pass
+
+            @staticmethod
+            def get_table_sql(table_name: str) -> str:
+                """
+                Get the statement which created a table (as it is now), one row with one column.
+
+                :param table_name: The name of the table.
+                :type table_name: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"SELECT sql FROM sqlite_master WHERE type = 'table' AND name = '{table_name}';"
+
+                """
+                pass
+
+            @staticmethod
+            def rebuild_create(table_name: str, table_sql: str, new_table: str, columns: List[tuple], primaryKey: str = None) -> Union[List[str], None]:
+                """
+                Create the new table, from the statement of the old one (see `get_table_sql()`), so its constraints are kept.
+
+                :param table_name: The name of the old table.
+                :type table_name: str
+                :param table_sql: The statement which created the old table.
+                :type table_sql: str
+                :param new_table: The name of the new table.
+                :type new_table: str
+                :param columns: The columns of the new table, in the form of `[(column_name, column_type), ...]`. Other columns of the old table are removed.
+                :type columns: List[tuple]
+                :param primaryKey: The primary key of the new table, if any.
+                :type primaryKey: str
+
+                :return: The statements, or None if the constraints can't be kept (E.g., a removed column is used by a `CHECK`).
+                :rtype: List[str] | None
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    # parse the column definitions and table constraints, drop / retype the columns, move the primary key
+                    create = _rebuild_definition(table_sql, new_table, columns, primaryKey)
+                    if create is None or "AUTOINCREMENT" not in _words(create):
+                        return create and [create]
+
+                    # ids of the rows deleted at the end are not used again
+                    return [create, f"INSERT INTO sqlite_sequence (name, seq) SELECT '{new_table}', seq FROM sqlite_sequence WHERE name = '{table_name}'"]
+
+                """
+                pass
+
+            @staticmethod
+            def rebuild_triggers(table_name: str, new_table: str, columns: List[str], key: str = None) -> List[str]:
+                """
+                Create the triggers which copy every insert / update / delete on the old table into the new one.
+
+                :param table_name: The name of the old table.
+                :type table_name: str
+                :param new_table: The name of the new table.
+                :type new_table: str
+                :param columns: The columns of the new table.
+                :type columns: List[str]
+                :param key: The primary key of the new table, to match the rows. If not given, rows are matched by the row id.
+                :type key: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    cols = ", ".join(columns)
+                    values = ", ".join(f"NEW.{col}" for col in columns)
+                    upsert = f"INSERT OR REPLACE INTO {new_table} ({cols}) VALUES ({values})"
+                    delete = f"DELETE FROM {new_table} WHERE {key} = OLD.{key}"
+                    return [
+                        f"CREATE TRIGGER {new_table}_ins AFTER INSERT ON {table_name} BEGIN {upsert}; END",
+                        f"CREATE TRIGGER {new_table}_upd AFTER UPDATE ON {table_name} BEGIN {delete}; {upsert}; END",
+                        f"CREATE TRIGGER {new_table}_del AFTER DELETE ON {table_name} BEGIN {delete}; END",
+                    ]
+
+                """
+                pass
+
+            @staticmethod
+            def rebuild_drop(new_table: str) -> List[str]:
+                """
+                Drop the triggers and the new table, when the rebuild is given up (or left by a crashed one).
+
+                :param new_table: The name of the new table.
+                :type new_table: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return [
+                        f"DROP TRIGGER IF EXISTS {new_table}_ins",
+                        f"DROP TRIGGER IF EXISTS {new_table}_upd",
+                        f"DROP TRIGGER IF EXISTS {new_table}_del",
+                        f"DROP TABLE IF EXISTS {new_table}",
+                        "PRAGMA legacy_alter_table = OFF",  # if the swap failed
+                    ]
+
+                """
+                pass
+
+            @staticmethod
+            def rebuild_range(table_name: str) -> str:
+                """
+                Get `(number of rows, min row id, max row id)` of the old table.
+
+                :param table_name: The name of the old table.
+                :type table_name: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"SELECT COUNT(*), MIN(rowid), MAX(rowid) FROM {table_name};"
+
+                """
+                pass
+
+            @staticmethod
+            def rebuild_bound(table_name: str, lower: str, offset: str) -> str:
+                """
+                Get the row id `offset` rows after `lower`, which is the (inclusive) end of the next chunk.
+
+                :param table_name: The name of the old table.
+                :type table_name: str
+                :param lower: The (exclusive) start of the chunk, a payload.
+                :type lower: str
+                :param offset: The size of the chunk minus one, a payload.
+                :type offset: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"SELECT rowid FROM {table_name} WHERE rowid > {lower} ORDER BY rowid LIMIT 1 OFFSET {offset};"
+
+                """
+                pass
+
+            @staticmethod
+            def rebuild_copy(table_name: str, new_table: str, columns: List[str], key: str, lower: str, upper: str) -> str:
+                """
+                Copy a chunk of rows (`lower < row id <= upper`) into the new table, replacing the ones already copied by the triggers.
+
+                :param table_name: The name of the old table.
+                :type table_name: str
+                :param new_table: The name of the new table.
+                :type new_table: str
+                :param columns: The columns of the new table.
+                :type columns: List[str]
+                :param key: The primary key of the new table. If not given, the row id is copied as well.
+                :type key: str
+                :param lower: The (exclusive) start of the chunk, a payload.
+                :type lower: str
+                :param upper: The (inclusive) end of the chunk, a payload.
+                :type upper: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    cols = ", ".join(columns) if key else f"rowid, {', '.join(columns)}"
+                    return (
+                        f"INSERT OR REPLACE INTO {new_table} ({cols}) "
+                        f"SELECT {cols} FROM {table_name} WHERE rowid > {lower} AND rowid <= {upper};"
+                    )
+
+                """
+                pass
+
+            @staticmethod
+            def rebuild_count(table_name: str, new_table: str) -> str:
+                """
+                Get `(number of rows of the old table, number of rows of the new table)` at the same time.
+                They differ if rows are merged by the new primary key (duplicated values).
+
+                :param table_name: The name of the old table.
+                :type table_name: str
+                :param new_table: The name of the new table.
+                :type new_table: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"SELECT (SELECT COUNT(*) FROM {table_name}), (SELECT COUNT(*) FROM {new_table});"
+
+                """
+                pass
+
+            @staticmethod
+            def rebuild_swap(table_name: str, new_table: str, indexes: List[str], triggers: List[str] = ()) -> List[str]:
+                """
+                Replace the old table with the new one. The commands are executed atomically.
+
+                :param table_name: The name of the old table.
+                :type table_name: str
+                :param new_table: The name of the new table.
+                :type new_table: str
+                :param indexes: The sql commands to create the indexes of the old table again.
+                :type indexes: List[str]
+                :param triggers: The sql commands to create the triggers of the old table again.
+                :type triggers: List[str]
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return [
+                        "PRAGMA legacy_alter_table = ON",   # views using the table are not checked while it's missing
+                        f"DROP TABLE {table_name}",
+                        f"ALTER TABLE {new_table} RENAME TO {table_name}",
+                        "PRAGMA legacy_alter_table = OFF",
+                        *indexes,
+                        *triggers,
+                    ]
+
+                """
+                pass
+
             @staticmethod
             def insert(table_name: str, columns: str, values: str) -> str:
                 """
@@ -307,6 +733,33 @@ class BaseDriver:
                 pass
                 # return f"INSERT OR REPLACE INTO {table_name} ({columns}) VALUES ({values})"
 
+            @staticmethod
+            def increment(table_name: str, key_column: str, value_column: str, values: str) -> str:
+                """
+                Add a number to the value of a row, or insert the row with the number if the key doesn't exist.
+                `key_column` must be unique (E.g., the primary key).
+
+                :param table_name: The name of the table.
+                :type table_name: str
+                :param key_column: The column to find the row.
+                :type key_column: str
+                :param value_column: The column to add to.
+                :type value_column: str
+                :param values: The placeholders of the key and the number, seperated by ','.
+                :type values: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return (
+                        f"INSERT INTO {table_name} ({key_column}, {value_column}) VALUES ({values}) "
+                        f"ON CONFLICT({key_column}) DO UPDATE SET {value_column} = {value_column} + excluded.{value_column}"
+                    )
+
+                """
+                pass
+
             @staticmethod
             def update(table_name: str, columns: str, condition: str) -> str:
                 """
@@ -330,7 +783,7 @@ class BaseDriver:
                 # return f"UPDATE {table_name} SET {columns} WHERE {condition}"
 
             @staticmethod
-            def query(table_name: str, selection: str, condition: str) -> str:
+            def query(table_name: str, selection: str, condition: str, order_by: str = "", limit: str = "", offset: str = "") -> str:
                 """
                 Query the specified table.
 
@@ -340,12 +793,29 @@ class BaseDriver:
                 :type selection: str
                 :param condition: The condition of the query, in the general SQL format, generated by Exp.
                 :type condition: str
+                :param order_by: The `ORDER BY` list, E.g., `name, age DESC`. Empty if not ordered.
+                :type order_by: str
+                :param limit: The placeholder of the `LIMIT` value. Empty if not limited.
+                :type limit: str
+                :param offset: The placeholder of the `OFFSET` value. Empty if no offset.
+                :type offset: str
+
+                .. note::
+                   `order_by`, `limit` and `offset` are only passed when they are used.
+                   So a driver only supports `query(table_name, selection, condition)` still works without them.
 
                 Example Implementation (SQLite):
 
                 .. code-block:: python
 
-                    return f"SELECT {selection} FROM {table_name} WHERE {condition}"
+                    cmd = f"SELECT {selection} FROM {table_name} WHERE {condition}"
+                    if order_by:
+                        cmd += f" ORDER BY {order_by}"
+                    if limit or offset:
+                        cmd += f" LIMIT {limit or -1}"
+                    if offset:
+                        cmd += f" OFFSET {offset}"
+                    return cmd
 
                 """
                 pass
@@ -370,6 +840,70 @@ class BaseDriver:
                 pass
                 # return f"DELETE FROM {table_name} WHERE {condition}"
 
+            @staticmethod
+            def exists(table_name: str, condition: str) -> str:
+                """
+                Check whether any row in specified table matches the condition. The result is a single row with `1` or `0`.
+
+                :param table_name: The name of the table to be checked.
+                :type table_name: str
+                :param condition: The condition of the rows, in the general SQL format, generated by Exp.
+                :type condition: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return f"SELECT EXISTS(SELECT 1 FROM {table_name} WHERE {condition})"
+
+                """
+                pass
+                # return f"SELECT EXISTS(SELECT 1 FROM {table_name} WHERE {condition})"
+
+            @staticmethod
+            def aggregate(table_name: str, aggregations: str, condition: str, group_by: str = "") -> str:
+                """
+                Aggregate the rows in specified table, which matches the condition.
+
+                :param table_name: The name of the table to be aggregated.
+                :type table_name: str
+                :param aggregations: The aggregations (and grouped columns) to select, E.g., `age, COUNT(*) AS n, AVG(score) AS avg_score`.
+                :type aggregations: str
+                :param condition: The condition of the rows, in the general SQL format, generated by Exp.
+                :type condition: str
+                :param group_by: The columns to group by, seperated by ','. Empty if not grouped.
+                :type group_by: str
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    cmd = f"SELECT {aggregations} FROM {table_name} WHERE {condition}"
+                    if group_by:
+                        cmd += f" GROUP BY {group_by}"
+                    return cmd
+
+                """
+                pass
+
+            @staticmethod
+            def enable_concurrent_read() -> str:
+                """
+                Prepare the database, so reader connections can run while the writer connection works.
+                It will be executed once on the writer connection, when the `CommandQueue` is started with `readers`.
+
+                :return: The SQL statement, or an empty string if nothing is needed.
+
+                Example Implementation (SQLite):
+
+                .. code-block:: python
+
+                    return "PRAGMA journal_mode=WAL;"
+
+                """
+                pass
+                # return "PRAGMA journal_mode=WAL;"
+
         @classmethod
         def get_all_tables(cls, conn: BaseDriver.Conn) -> List[str]:
             """
@@ -411,6 +945,47 @@ class BaseDriver:
             cursor.execute(cls.gensql.get_all_columns(table_name))
             return cursor.fetchall()
 
+        @classmethod
+        def get_catalog(cls, db) -> Dict[str, List[list]]:
+            """
+            Get all column's informations of all the tables in the database, by one query.
+
+            The default implementation is based on the `cls.gensql.get_catalog()` method.
+            Drivers without it fall back to `get_all_tables()` & `get_all_columns()` for each table.
+
+            :param db: The database object.
+            :type db: DataBase
+
+            :return: A mapping from table name to its columns, in the same format as `get_all_columns()`.
+            :rtype: Dict[str, List[list]]
+            """
+            sql = cls.gensql.get_catalog()
+            if not sql:
+                return {name: cls.get_all_columns(db, name) for name in cls.get_all_tables(db)}
+
+            catalog = {}
+            for row in db.do(sql, readonly=True).fetchall():
+                catalog.setdefault(row[0], []).append(list(row[1:]))
+
+            return catalog
+
+        @classmethod
+        def schema_fingerprint(cls, db) -> Union[str, None]:
+            """
+            Get the fingerprint of the schema, see `cls.gensql.schema_fingerprint()`.
+
+            :param db: The database object.
+            :type db: DataBase
+
+            :return: The fingerprint, or `None` if not supported.
+            :rtype: str | None
+            """
+            sql = cls.gensql.schema_fingerprint()
+            if not sql:
+                return None
+
+            return repr(db.do(sql, readonly=True).fetchall())
+
     class TypeParser:
         """
         Parse the type from `Python Type` -> `SQL Type`.
@@ -470,6 +1045,42 @@ class BaseDriver:
             # Not Supported
             raise Exception(f"Type `{str(type_)}` not supported.")
 
+        @staticmethod
+        def dtype(sql_type: str) -> Union[str, None]:
+            """
+            Get the NumPy dtype for values of a SQL type, used by columnar results (`select(..., format="columnar")`).
+
+            :param sql_type: The type of the column, as it is in `Table.columnsType`.
+            :type sql_type: str
+
+            :return: The dtype name (`'int64'`, `'float64'` or `'bool'`), or None if the column is not numeric.
+            :rtype: str | None
+
+            .. note::
+                I've provided a example implementation of this method, for SQLite (based on its type affinity rules).
+                Look at the source code.
+
+            Example Usage:
+
+            .. code-block:: python
+
+                TypeParser.dtype('INTEGER')     # int64
+                TypeParser.dtype('REAL')        # float64
+                TypeParser.dtype('TEXT')        # None
+                ...
+
+            """
+            sql_type = sql_type.upper()
+
+            if "INT" in sql_type:
+                return "int64"
+            if any(t in sql_type for t in ("REAL", "FLOA", "DOUB")):
+                return "float64"
+            if "BOOL" in sql_type:
+                return "bool"
+            # TEXT, BLOB, NUMERIC, DATE, DATETIME, ... may hold any value (E.g., '2024-01-01')
+            return None
+
     @staticmethod
     def connect(db_name: str, **kwargs) -> BaseDriver.Conn:
         """
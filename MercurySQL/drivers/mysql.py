@@ -3,9 +3,10 @@ Requirements:
   - mysql-connector-python
 """
 from .base import BaseDriver
+from ..errors import NotSupportedError
 
 import mysql.connector
-from typing import Any, List
+from typing import Any, List, Union, Dict
 
 
 class Driver_MySQL(BaseDriver):
@@ -20,6 +21,7 @@ class Driver_MySQL(BaseDriver):
     dependencies = ['mysql-connector-python']
     version = '0.1.0'
     payload = '%s'
+    max_variables = 65535  # placeholders in a prepared statement
 
     Conn = mysql.connector.MySQLConnection
     Cursor = mysql.connector.cursor_cext.CMySQLCursor
@@ -34,6 +36,26 @@ class Driver_MySQL(BaseDriver):
             def get_all_tables() -> str:
                 return "SHOW TABLES;"
 
+            @staticmethod
+            def get_catalog() -> str:
+                # same fields as `DESCRIBE`
+                return (
+                    "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA "
+                    "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() "
+                    "ORDER BY TABLE_NAME, ORDINAL_POSITION;"
+                )
+
+            @staticmethod
+            def schema_fingerprint() -> str:
+                # `CREATE_TIME` is renewed when a table is rebuilt, but not by `RENAME TABLE` / instant `ALTER TABLE`s,
+                # so every field of `get_catalog()` is summed up by a checksum too (a sum, not `GROUP_CONCAT`, which is truncated)
+                return (
+                    "SELECT COUNT(*), SUM(CRC32(CONCAT_WS(0x1F, "
+                    "TABLE_NAME, ORDINAL_POSITION, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA))), "
+                    "(SELECT MAX(CREATE_TIME) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()) "
+                    "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE();"
+                )
+
             @staticmethod
             def get_all_columns(table_name: str) -> str:
                 return f"DESCRIBE `{table_name}`;"
@@ -46,6 +68,33 @@ class Driver_MySQL(BaseDriver):
                     ) {engine} {f'DEFAULT CHARSET={charset}' if charset else ''};
                 """
 
+            @staticmethod
+            def create_table(table_name: str, columns: List[tuple], primaryKey: str = None, autoIncrement=False, engine='', charset='') -> str:
+                definitions = ", ".join(
+                    f"`{name}` {type_} PRIMARY KEY{' AUTO_INCREMENT' if autoIncrement else ''}" if name == primaryKey else f"`{name}` {type_}"
+                    for name, type_ in columns
+                )
+                return f"CREATE TABLE IF NOT EXISTS `{table_name}` ({definitions}) {engine} {f'DEFAULT CHARSET={charset}' if charset else ''};"
+
+            @staticmethod
+            def create_index(index_name: str, table_name: str, columns: str, unique=False, where: str = "") -> str:
+                if where:
+                    raise NotSupportedError("Partial indexes are not supported by MySQL.")
+                columns = ", ".join(f"`{col.strip()}`" for col in columns.split(","))
+                return f"CREATE {'UNIQUE ' if unique else ''}INDEX `{index_name}` ON `{table_name}` ({columns});"
+
+            @staticmethod
+            def drop_index(index_name: str, table_name: str) -> str:
+                return f"DROP INDEX `{index_name}` ON `{table_name}`;"
+
+            @staticmethod
+            def get_indexes(table_name: str) -> str:
+                return (
+                    f"SELECT INDEX_NAME, NOT NON_UNIQUE, 0, COLUMN_NAME FROM information_schema.STATISTICS "
+                    f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table_name}' AND INDEX_NAME <> 'PRIMARY' "
+                    f"ORDER BY INDEX_NAME, SEQ_IN_INDEX;"
+                )
+
             @staticmethod
             def add_column(table_name: str, column_name: str, column_type: str) -> str:
                 return f"ALTER TABLE `{table_name}` ADD COLUMN `{column_name}` {column_type};"
@@ -70,18 +119,48 @@ class Driver_MySQL(BaseDriver):
                 update_columns = ', '.join(f'{col}=VALUES({col})' for col in columns.split(', '))
                 return f"INSERT INTO `{table_name}` ({columns}) VALUES ({values}) ON DUPLICATE KEY UPDATE {update_columns};"
 
+            @staticmethod
+            def increment(table_name: str, key_column: str, value_column: str, values: str) -> str:
+                return (
+                    f"INSERT INTO `{table_name}` ({key_column}, {value_column}) VALUES ({values}) "
+                    f"ON DUPLICATE KEY UPDATE {value_column} = {value_column} + VALUES({value_column});"
+                )
+
             @staticmethod
             def update(table_name: str, columns: str, condition: str) -> str:
                 return f"UPDATE `{table_name}` SET {columns} WHERE {condition};"
 
             @staticmethod
-            def query(table_name: str, selection: str, condition: str) -> str:
-                return f"SELECT {selection} FROM `{table_name}` WHERE {condition};"
+            def query(table_name: str, selection: str, condition: str, order_by: str = "", limit: str = "", offset: str = "") -> str:
+                cmd = f"SELECT {selection} FROM `{table_name}` WHERE {condition}"
+                if order_by:
+                    cmd += f" ORDER BY {order_by}"
+                if limit or offset:
+                    cmd += f" LIMIT {limit or 18446744073709551615}"   # OFFSET needs a LIMIT, use the max one
+                if offset:
+                    cmd += f" OFFSET {offset}"
+                return cmd + ";"
 
             @staticmethod
             def delete(table_name: str, condition: str) -> str:
                 return f"DELETE FROM `{table_name}` WHERE {condition};"
 
+            @staticmethod
+            def exists(table_name: str, condition: str) -> str:
+                return f"SELECT EXISTS(SELECT 1 FROM `{table_name}` WHERE {condition});"
+
+            @staticmethod
+            def aggregate(table_name: str, aggregations: str, condition: str, group_by: str = "") -> str:
+                cmd = f"SELECT {aggregations} FROM `{table_name}` WHERE {condition}"
+                if group_by:
+                    cmd += f" GROUP BY {group_by}"
+                return cmd + ";"
+
+            @staticmethod
+            def enable_concurrent_read() -> str:
+                # InnoDB already allows consistent reads while writing
+                return ""
+
         @classmethod
         def get_all_tables(cls, conn) -> List[str]:
             cursor = conn.cursor()
@@ -95,6 +174,18 @@ class Driver_MySQL(BaseDriver):
             # [name, type, null, key, default, extra]
             return list(map(lambda x: [x[0], x[1], x[2], x[3], x[4], x[5]], cursor.fetchall()))
 
+        @classmethod
+        def get_catalog(cls, db) -> Dict[str, List[list]]:
+            catalog = {}
+            for row in db.do(cls.gensql.get_catalog(), readonly=True).fetchall():
+                # [name, type, null, key, default, extra]
+                catalog.setdefault(row[0], []).append(list(row[1:7]))
+            return catalog
+
+        @classmethod
+        def schema_fingerprint(cls, db) -> str:
+            return repr(db.do(cls.gensql.schema_fingerprint(), readonly=True).fetchall())
+
     class TypeParser:
         """
         Parse the type from `Python Type` -> `MySQL Type`.
@@ -189,6 +280,34 @@ class Driver_MySQL(BaseDriver):
             
             return res
 
+        @staticmethod
+        def dtype(sql_type: str) -> Union[str, None]:
+            """
+            Get the NumPy dtype for values of a MySQL type.
+
+            +----------------------------------------+-----------+
+            | MySQL Type                             | dtype     |
+            +========================================+===========+
+            | BOOLEAN / TINYINT(1)                   | bool      |
+            +----------------------------------------+-----------+
+            | INT / TINYINT / BIGINT / ...           | int64     |
+            +----------------------------------------+-----------+
+            | FLOAT / DOUBLE / REAL / DECIMAL        | float64   |
+            +----------------------------------------+-----------+
+            | others                                 | None      |
+            +----------------------------------------+-----------+
+            """
+            sql_type = sql_type.upper()
+
+            if sql_type.startswith(("BOOL", "TINYINT(1)")):
+                return "bool"
+            base = sql_type.split("(")[0].split(" ")[0]
+            if base.endswith("INT") or base == "INTEGER":
+                return "int64"
+            if sql_type.startswith(("FLOAT", "DOUBLE", "REAL", "DEC", "NUMERIC")):
+                return "float64"
+            return None
+
     @staticmethod
     def connect(db_name: str, host: str, user: str, passwd: str = '', force=False) -> Conn:
         """
@@ -4,8 +4,148 @@ Requirements:
 """
 from .base import BaseDriver
 
+import re
 import sqlite3
-from typing import Any, List
+from typing import Any, List, Union, Dict
+
+
+# ========= Table Definitions =========
+# identifiers (quoted in any of the 3 ways), strings, numbers / words, or single symbols
+_TOKEN = re.compile(r"""\"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]|'(?:[^']|'')*'|\w+|\S""")
+
+# where the type of a column definition ends
+_COLUMN_CONSTRAINTS = {"CONSTRAINT", "PRIMARY", "NOT", "NULL", "UNIQUE", "CHECK", "DEFAULT", "COLLATE", "REFERENCES", "GENERATED", "AS"}
+_TABLE_CONSTRAINTS = {"CONSTRAINT", "PRIMARY", "UNIQUE", "CHECK", "FOREIGN"}
+
+
+def _name(token: str) -> str:
+    """
+    [Helper] The identifier of a token, unquoted and case folded (SQLite ignores the case of names).
+    """
+    if token[0] in "\"`[":
+        token = token[1:-1]
+    return token.lower()
+
+
+def _split_table_sql(sql: str) -> tuple:
+    """
+    [Helper] Split a `CREATE TABLE` statement into the definitions of its columns & constraints, and the table options after them (E.g., `WITHOUT ROWID`).
+    """
+    depth, start, parts = 0, None, []
+    for m in _TOKEN.finditer(sql):
+        token = m.group()
+        if token == "(":
+            depth += 1
+            if depth == 1:
+                start = m.end()
+        elif token == ")":
+            depth -= 1
+            if depth == 0:
+                parts.append(sql[start:m.start()].strip())
+                return parts, sql[m.end():].strip()
+        elif token == "," and depth == 1:
+            parts.append(sql[start:m.start()].strip())
+            start = m.end()
+
+    raise ValueError(f"Can't parse the table definition: {sql}")
+
+
+def _words(definition: str) -> List[str]:
+    """
+    [Helper] The tokens of a definition, upper cased, to look for keywords.
+    """
+    return [token.upper() for token in _TOKEN.findall(definition)]
+
+
+def _drop_primary_key(definition: str) -> str:
+    """
+    [Helper] Remove the `[CONSTRAINT name] PRIMARY KEY [ASC|DESC] [ON CONFLICT ...] [AUTOINCREMENT]` clause of a column definition.
+    """
+    tokens = list(_TOKEN.finditer(definition))
+    words = [t.group().upper() for t in tokens]
+
+    i = words.index("PRIMARY")
+    j = i + 2  # PRIMARY KEY
+    if j < len(words) and words[j] in ("ASC", "DESC"):
+        j += 1
+    if j + 1 < len(words) and words[j] == "ON" and words[j + 1] == "CONFLICT":
+        j += 3
+    if j < len(words) and words[j] == "AUTOINCREMENT":
+        j += 1
+    if i >= 2 and words[i - 2] == "CONSTRAINT":
+        i -= 2
+
+    end = tokens[j - 1].end()
+    return f"{definition[:tokens[i].start()].rstrip()} {definition[end:].lstrip()}".strip()
+
+
+def _rebuild_definition(table_sql: str, new_table: str, columns: List[tuple], primaryKey: str = None) -> Union[str, None]:
+    """
+    [Helper] Generate the `CREATE TABLE` statement of `new_table` from the one of the old table (in `sqlite_master`),
+    so all the constraints (`NOT NULL`, `DEFAULT`, `UNIQUE`, `CHECK`, `FOREIGN KEY`, `AUTOINCREMENT`...) are kept.
+
+    Columns not in `columns` are removed, the types are changed to the ones in `columns`, and the primary key is set to `primaryKey`.
+
+    :return: The statement, or None if it can't be done without losing a constraint (E.g., a removed column is used by a `CHECK`), or the table has no row id.
+    """
+    definitions, options = _split_table_sql(table_sql)
+    if "WITHOUT" in options.upper():
+        return None
+
+    types = {name.lower(): type_ for name, type_ in columns}
+    key = [] if primaryKey is None else [primaryKey.lower()]
+
+    # [column name or None, definition]
+    parsed = []
+    old_key = []
+    for definition in definitions:
+        tokens = _TOKEN.findall(definition)
+        words = _words(definition)
+
+        if words[0] in _TABLE_CONSTRAINTS:
+            if "PRIMARY" in words[:3]:
+                start = words.index("(") + 1
+                old_key = [_name(t) for t, w in zip(tokens[start:words.index(")")], words[start:]) if w not in (",", "ASC", "DESC")]
+            parsed.append([None, definition])
+            continue
+
+        name = _name(tokens[0])
+        if "PRIMARY" in words:
+            old_key = [name]
+        parsed.append([name, definition])
+
+    if old_key != key:
+        # drop the old one, the new one is added to the column below
+        parsed = [
+            [name, _drop_primary_key(definition) if "PRIMARY" in _words(definition) else definition]
+            for name, definition in parsed
+            if name is not None or "PRIMARY" not in _words(definition)[:3]
+        ]
+
+    removed = {name for name, _ in parsed if name is not None and name not in types}
+    kept = []
+    for name, definition in parsed:
+        if name in removed:
+            continue
+
+        tokens = list(_TOKEN.finditer(definition))
+        if removed & {_name(t.group()) for t in tokens if t.group()[0] != "'"}:
+            # used by a constraint (or a generated column) which can't be kept without it
+            return None
+
+        if name is not None:
+            # `name type constraints...`, the type is made of the words before the first constraint
+            end = next((i for i, t in enumerate(tokens) if i > 0 and t.group().upper() in _COLUMN_CONSTRAINTS), len(tokens))
+            old_type = definition[tokens[0].end():tokens[end - 1].end()] if end > 1 else ""
+            if "".join(old_type.split()).upper() != "".join(types[name].split()).upper():
+                rest = definition[tokens[end - 1].end():] if end > 1 else definition[tokens[0].end():]
+                definition = f"{tokens[0].group()} {types[name]}{rest}"
+            if old_key != key and name in key:
+                definition += " PRIMARY KEY"
+
+        kept.append(definition)
+
+    return f"CREATE TABLE {new_table} ({', '.join(kept)}){' ' + options if options else ''}"
 
 
 class Driver_SQLite(BaseDriver):
@@ -16,6 +156,8 @@ class Driver_SQLite(BaseDriver):
     dependencies = ['sqlite3']
     version = '0.1.0'
     payload = '?'
+    max_variables = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999  # SQLITE_MAX_VARIABLE_NUMBER
+    online_rebuild = True   # rowid + triggers, see `gensql.rebuild`
 
     Conn = sqlite3.Connection
     Cursor = sqlite3.Cursor
@@ -30,6 +172,24 @@ class Driver_SQLite(BaseDriver):
             def get_all_tables() -> str:
                 return "SELECT name FROM sqlite_master WHERE type='table';"
 
+            @staticmethod
+            def get_catalog() -> str:
+                # table-valued pragma, needs SQLite 3.16+
+                return (
+                    "SELECT m.name, p.name, p.type FROM sqlite_master AS m "
+                    "JOIN pragma_table_info(m.name) AS p "
+                    "WHERE m.type = 'table' ORDER BY m.name, p.cid;"
+                )
+
+            @staticmethod
+            def schema_fingerprint() -> str:
+                # `schema_version` is bumped by SQLite on every schema change,
+                # the size of the schema tells apart another file (E.g., a replaced one) which happens to have the same version
+                return (
+                    "SELECT (SELECT schema_version FROM pragma_schema_version), COUNT(*), TOTAL(LENGTH(sql)) "
+                    "FROM sqlite_master;"
+                )
+
             @staticmethod
             def get_all_columns(table_name: str) -> str:
                 return f"PRAGMA table_info({table_name});"
@@ -40,6 +200,30 @@ class Driver_SQLite(BaseDriver):
                     CREATE TABLE IF NOT EXISTS {table_name} ({column_name} {column_type} {'PRIMARY KEY' if primaryKey else ''} {'AUTOINCREMENT' if autoIncrement else ''})
                 """
 
+            @staticmethod
+            def create_table(table_name: str, columns: List[tuple], primaryKey: str = None, autoIncrement=False) -> str:
+                definitions = ", ".join(
+                    f"{name} {type_} PRIMARY KEY{' AUTOINCREMENT' if autoIncrement else ''}" if name == primaryKey else f"{name} {type_}"
+                    for name, type_ in columns
+                )
+                return f"CREATE TABLE IF NOT EXISTS {table_name} ({definitions})"
+
+            @staticmethod
+            def create_index(index_name: str, table_name: str, columns: str, unique=False, where: str = "") -> str:
+                return f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns}){f' WHERE {where}' if where else ''}"
+
+            @staticmethod
+            def drop_index(index_name: str, table_name: str) -> str:
+                return f"DROP INDEX IF EXISTS {index_name}"
+
+            @staticmethod
+            def get_indexes(table_name: str) -> str:
+                return (
+                    f"SELECT il.name, il.[unique], il.partial, ii.name FROM pragma_index_list('{table_name}') AS il "
+                    # origin 'c': by `CREATE INDEX`, not for the primary key ('pk') / `UNIQUE` constraints ('u'), which can't be dropped
+                    f"JOIN pragma_index_info(il.name) AS ii WHERE il.origin = 'c' ORDER BY il.name, ii.seqno;"
+                )
+
             @staticmethod
             def add_column(table_name: str, column_name: str, column_type: str) -> str:
                 return f"""
@@ -61,6 +245,100 @@ class Driver_SQLite(BaseDriver):
                     f"ALTER TABLE ___temp_table RENAME TO {table.table_name}"
                 ]
 
+            @staticmethod
+            def get_primary_key(table_name: str) -> str:
+                return f"SELECT name FROM pragma_table_info('{table_name}') WHERE pk > 0 ORDER BY pk;"
+
+            @staticmethod
+            def get_index_sql(table_name: str) -> str:
+                # auto indexes (of UNIQUE / PRIMARY KEY) have no sql, they come back with the table
+                return f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = '{table_name}' AND sql IS NOT NULL;"
+
+            @staticmethod
+            def get_trigger_sql(table_name: str) -> str:
+                # but not the ones of a rebuild
+                return f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = '{table_name}' AND name NOT GLOB '___rebuild_*';"
+
+            @staticmethod
+            def get_view_sql() -> str:
+                return "SELECT name, sql FROM sqlite_master WHERE type = 'view';"
+
+            @staticmethod
+            def get_table_sql(table_name: str) -> str:
+                return f"SELECT sql FROM sqlite_master WHERE type = 'table' AND name = '{table_name}';"
+
+            @staticmethod
+            def rebuild_create(table_name: str, table_sql: str, new_table: str, columns: List[tuple], primaryKey: str = None) -> Union[List[str], None]:
+                # from the original statement, so the constraints are kept
+                create = _rebuild_definition(table_sql, new_table, columns, primaryKey)
+                if create is None or "AUTOINCREMENT" not in _words(create):
+                    return create and [create]
+
+                # ids of the rows deleted at the end are not used again
+                return [create, f"INSERT INTO sqlite_sequence (name, seq) SELECT '{new_table}', seq FROM sqlite_sequence WHERE name = '{table_name}'"]
+
+            @staticmethod
+            def rebuild_triggers(table_name: str, new_table: str, columns: List[str], key: str = None) -> List[str]:
+                # rows are matched by the new primary key, or by the (copied) rowid if there is none
+                cols = ", ".join(columns)
+                values = ", ".join(f"NEW.{col}" for col in columns)
+                if key:
+                    upsert = f"INSERT OR REPLACE INTO {new_table} ({cols}) VALUES ({values})"
+                    delete = f"DELETE FROM {new_table} WHERE {key} = OLD.{key}"
+                else:
+                    upsert = f"INSERT OR REPLACE INTO {new_table} (rowid, {cols}) VALUES (NEW.rowid, {values})"
+                    delete = f"DELETE FROM {new_table} WHERE rowid = OLD.rowid"
+
+                return [
+                    f"CREATE TRIGGER {new_table}_ins AFTER INSERT ON {table_name} BEGIN {upsert}; END",
+                    f"CREATE TRIGGER {new_table}_upd AFTER UPDATE ON {table_name} BEGIN {delete}; {upsert}; END",
+                    f"CREATE TRIGGER {new_table}_del AFTER DELETE ON {table_name} BEGIN {delete}; END",
+                ]
+
+            @staticmethod
+            def rebuild_drop(new_table: str) -> List[str]:
+                return [
+                    f"DROP TRIGGER IF EXISTS {new_table}_ins",
+                    f"DROP TRIGGER IF EXISTS {new_table}_upd",
+                    f"DROP TRIGGER IF EXISTS {new_table}_del",
+                    f"DROP TABLE IF EXISTS {new_table}",
+                    "PRAGMA legacy_alter_table = OFF",  # if the swap failed
+                ]
+
+            @staticmethod
+            def rebuild_range(table_name: str) -> str:
+                return f"SELECT COUNT(*), MIN(rowid), MAX(rowid) FROM {table_name};"
+
+            @staticmethod
+            def rebuild_bound(table_name: str, lower: str, offset: str) -> str:
+                # the last rowid of the next chunk, walks the rowid b-tree only
+                return f"SELECT rowid FROM {table_name} WHERE rowid > {lower} ORDER BY rowid LIMIT 1 OFFSET {offset};"
+
+            @staticmethod
+            def rebuild_copy(table_name: str, new_table: str, columns: List[str], key: str, lower: str, upper: str) -> str:
+                cols = ", ".join(columns) if key else f"rowid, {', '.join(columns)}"
+                return (
+                    f"INSERT OR REPLACE INTO {new_table} ({cols}) "
+                    f"SELECT {cols} FROM {table_name} WHERE rowid > {lower} AND rowid <= {upper};"
+                )
+
+            @staticmethod
+            def rebuild_count(table_name: str, new_table: str) -> str:
+                return f"SELECT (SELECT COUNT(*) FROM {table_name}), (SELECT COUNT(*) FROM {new_table});"
+
+            @staticmethod
+            def rebuild_swap(table_name: str, new_table: str, indexes: List[str], triggers: List[str] = ()) -> List[str]:
+                # the triggers are dropped with the old table.
+                # legacy rename doesn't check the views / triggers which use the table, it's missing in between
+                return [
+                    "PRAGMA legacy_alter_table = ON",
+                    f"DROP TABLE {table_name}",
+                    f"ALTER TABLE {new_table} RENAME TO {table_name}",
+                    "PRAGMA legacy_alter_table = OFF",
+                    *indexes,
+                    *triggers,
+                ]
+
             @staticmethod
             def insert(table_name: str, columns: str, values: str) -> str:
                 return f"INSERT INTO {table_name} ({columns}) VALUES ({values})"
@@ -69,18 +347,48 @@ class Driver_SQLite(BaseDriver):
             def insert_or_update(table_name: str, columns: str, values: str) -> str:
                 return f"INSERT OR REPLACE INTO {table_name} ({columns}) VALUES ({values})"
 
+            @staticmethod
+            def increment(table_name: str, key_column: str, value_column: str, values: str) -> str:
+                # needs SQLite 3.24+
+                return (
+                    f"INSERT INTO {table_name} ({key_column}, {value_column}) VALUES ({values}) "
+                    f"ON CONFLICT({key_column}) DO UPDATE SET {value_column} = {value_column} + excluded.{value_column}"
+                )
+
             @staticmethod
             def update(table_name: str, columns: str, condition: str) -> str:
                 return f"UPDATE {table_name} SET {columns} WHERE {condition}"
 
             @staticmethod
-            def query(table_name: str, selection: str, condition: str) -> str:
-                return f"SELECT {selection} FROM {table_name} WHERE {condition}"
+            def query(table_name: str, selection: str, condition: str, order_by: str = "", limit: str = "", offset: str = "") -> str:
+                cmd = f"SELECT {selection} FROM {table_name} WHERE {condition}"
+                if order_by:
+                    cmd += f" ORDER BY {order_by}"
+                if limit or offset:
+                    cmd += f" LIMIT {limit or -1}"   # OFFSET needs a LIMIT, -1 means no limit
+                if offset:
+                    cmd += f" OFFSET {offset}"
+                return cmd
 
             @staticmethod
             def delete(table_name: str, condition: str) -> str:
                 return f"DELETE FROM {table_name} WHERE {condition}"
 
+            @staticmethod
+            def exists(table_name: str, condition: str) -> str:
+                return f"SELECT EXISTS(SELECT 1 FROM {table_name} WHERE {condition})"
+
+            @staticmethod
+            def aggregate(table_name: str, aggregations: str, condition: str, group_by: str = "") -> str:
+                cmd = f"SELECT {aggregations} FROM {table_name} WHERE {condition}"
+                if group_by:
+                    cmd += f" GROUP BY {group_by}"
+                return cmd
+
+            @staticmethod
+            def enable_concurrent_read() -> str:
+                return "PRAGMA journal_mode=WAL;"
+
         @classmethod
         def get_all_tables(cls, db) -> List[str]:
             cursor = db.do(cls.gensql.get_all_tables())
@@ -91,6 +399,17 @@ class Driver_SQLite(BaseDriver):
             cursor = db.do(cls.gensql.get_all_columns(table_name))
             return list(map(lambda x: [x[1], x[2]], cursor.fetchall()))
 
+        @classmethod
+        def get_catalog(cls, db) -> Dict[str, List[list]]:
+            catalog = {}
+            for table_name, name, type_ in db.do(cls.gensql.get_catalog(), readonly=True).fetchall():
+                catalog.setdefault(table_name, []).append([name, type_])
+            return catalog
+
+        @classmethod
+        def schema_fingerprint(cls, db) -> str:
+            return repr(db.do(cls.gensql.schema_fingerprint(), readonly=True).fetchall())
+
     class TypeParser:
         """
         Parse the type from `Python Type` -> `SQL Type`.
@@ -160,6 +479,35 @@ class Driver_SQLite(BaseDriver):
             # Not Supported
             raise TypeError(f"Type `{str(type_)}` not supported.")
 
+        @staticmethod
+        def dtype(sql_type: str) -> Union[str, None]:
+            """
+            Get the NumPy dtype for values of a SQLite type, following the type affinity rules.
+
+            +-----------------------+-----------+
+            | SQLite Type           | dtype     |
+            +=======================+===========+
+            | contains INT          | int64     |
+            +-----------------------+-----------+
+            | REAL / FLOAT / DOUBLE | float64   |
+            +-----------------------+-----------+
+            | BOOLEAN               | bool      |
+            +-----------------------+-----------+
+            | others (TEXT, DATE,   | None      |
+            | NUMERIC, no type ...) |           |
+            +-----------------------+-----------+
+            """
+            sql_type = sql_type.upper()
+
+            if "INT" in sql_type:
+                return "int64"
+            if any(t in sql_type for t in ("REAL", "FLOA", "DOUB")):
+                return "float64"
+            if "BOOL" in sql_type:
+                return "bool"
+            # TEXT, BLOB, NUMERIC, DATE, DATETIME, ... may hold any value (E.g., '2024-01-01')
+            return None
+
     @staticmethod
     def connect(db_name: str, **kwargs) -> Driver_SQLite.Conn:
         return sqlite3.connect(db_name, **kwargs)
@@ -4,3 +4,4 @@ Copyright (c) Bernie Huang 2023, all rights reserved.
 from .database import DataBase, set_driver
 from .exp import Exp
 from .table import Table
+from .aio import AsyncDataBase, AsyncTable
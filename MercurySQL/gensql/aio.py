@@ -0,0 +1,218 @@
+"""
+MercurySQL.gensql.aio
+=====================
+This file offers the asyncio version of `DataBase` and `Table`, for using MercurySQL inside an event loop.
+
+Classes
+-------
+- `AsyncDataBase`: Wraps a `DataBase`, and provides awaitable methods for executing SQL commands.
+- `AsyncTable`: Wraps a `Table`, and provides awaitable methods for selecting, inserting and updating rows.
+
+.. note::
+   Commands are still executed by the `CommandQueue` thread(s). The event loop is never blocked while waiting:
+   every command's future is resolved back into the loop through `loop.call_soon_threadsafe()` (by `asyncio.wrap_future()`).
+"""
+
+import asyncio
+import queue
+from typing import List
+
+from .database import DataBase
+from .table import Table, QueryResult
+from .exp import Exp
+from .row import QueryResultRow
+
+
+# ========== Class Decorations ==========
+class AsyncTable:
+    pass
+
+
+# ========== Classes ==========
+class AsyncDataBase:
+    """
+    The asyncio version of `DataBase`.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        adb = AsyncDataBase('test.db')
+        tb = adb['test']
+
+        async def handler(uid):
+            res = await tb.select(tb['id'] == uid)
+            await tb.insert(id=uid + 1, name='Bernie')
+
+    """
+
+    def __init__(self, db_name, driver=None, **kwargs):
+        """
+        Create a new database object, same arguments as `DataBase`.
+
+        :param db_name: The name of the database, or an existing `DataBase` object.
+        :type db_name: str | DataBase
+
+        .. note::
+           Connecting and gathering informations of the database are not async, so create it before the loop starts.
+        """
+        if isinstance(db_name, DataBase):
+            self.db = db_name
+        else:
+            self.db = DataBase(db_name, driver, **kwargs)
+
+        self.driver = self.db.driver
+
+    async def do(self, *sql: str, paras: List[tuple] = [], readonly: bool = False, table: str = None) -> list:
+        """
+        Execute sql command(s) on the database, same arguments as `DataBase.do()`.
+
+        :return: The fetched rows of the last command.
+        :rtype: list
+
+        Example Usage:
+
+        .. code-block:: python
+
+            rows = await adb.do("SELECT * FROM test WHERE id = ?", paras=[(1,)], readonly=True)
+
+        """
+        futures = self.db.do_many_async(*sql, paras=paras, readonly=readonly, table=table)
+
+        # commands are executed in order, so only the last one needs to be awaited ...
+        res = await asyncio.wrap_future(futures[-1])
+        # ... but errors of the others should not be lost
+        for f in futures[:-1]:
+            f.result()
+
+        return res
+
+    def __getitem__(self, key: str) -> AsyncTable:
+        """
+        Choose a table from the database, same as `DataBase.__getitem__()`.
+
+        :param key: The name of the table.
+        :type key: str
+
+        :return: An AsyncTable object.
+        :rtype: AsyncTable
+        """
+        return AsyncTable(self, self.db[key])
+
+
+class AsyncTable:
+    """
+    The asyncio version of `Table`. Can be got by `adb['table_name']`.
+
+    Structure operations (adding columns, etc.) are not async, use `AsyncTable.table` for them.
+    """
+
+    def __init__(self, adb: AsyncDataBase, table: Table):
+        self.adb = adb
+        self.table = table
+
+    def __getitem__(self, key: str) -> Exp:
+        """
+        Get a column from the table, same as `Table.__getitem__()`.
+        """
+        return self.table[key]
+
+    async def select(self, exp: Exp = None, selection: str = "*", order_by=None, limit: int = None, offset: int = None) -> QueryResult:
+        """
+        Select data from the table, same arguments as `Table.select()`.
+
+        :return: The query result.
+        :rtype: QueryResult
+
+        Example Usage:
+
+        .. code-block:: python
+
+            tb = adb['test']
+            res = await tb.select(tb['id'] == 1)
+
+        """
+        if exp is None:
+            exp = Exp(1, "=", 1)
+
+        clauses = {"limit": limit, "offset": offset}
+        if order_by:
+            clauses["order_by"] = self.table._order_by(order_by)
+
+        values = []
+        for cmd, paras in exp.query_cmds(self.table, selection, **clauses):
+            # same as `Table.select()`, so the result cache is used as well
+            future = self.adb.db._read_async(self.table.table_name, cmd, paras)
+            values.extend(await asyncio.wrap_future(future))
+
+        return QueryResult(self.table, exp, selection, values=values, **clauses)
+
+    async def stream(self, exp: Exp = None, selection: str = "*", chunk: int = 1000):
+        """
+        Iterate through the selected rows with `async for`, fetching them in chunks (see `Table.stream()`).
+
+        Example Usage:
+
+        .. code-block:: python
+
+            tb = adb['test']
+            async for row in tb.stream(tb['age'] > 18):
+                print(row)
+
+        """
+        if exp is None:
+            exp = Exp(1, "=", 1)
+
+        keys = self.table._selection_keys(selection)
+        index = {key: i for i, key in enumerate(keys)}
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        for cmd, paras in exp.query_cmds(self.table, selection):
+            future = self.adb.db.do_many_async(cmd, paras=[paras], readonly=True, chunk=chunk)[-1]
+            stream = await asyncio.wrap_future(future)
+            # the worker wakes up the loop, no thread waits for the chunks
+            stream.on_put = lambda: loop.call_soon_threadsafe(ready.set)
+
+            try:
+                while True:
+                    ready.clear()   # before checking, so a chunk handed over meanwhile is not missed
+                    try:
+                        rows = stream.get_nowait()
+                    except queue.Empty:
+                        await ready.wait()
+                        continue
+
+                    if not rows:
+                        break
+
+                    for row in rows:
+                        yield QueryResultRow(row, index)
+            finally:
+                stream.on_put = None
+                stream.close()
+
+    async def insert(self, __auto=False, **kwargs) -> None:
+        """
+        Insert a row into the table, same arguments as `Table.insert()`.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            tb = adb['test']
+            await tb.insert(id=1, name='Bernie', __auto=True)
+
+        """
+        cmd, values = self.table._insert_cmd(kwargs, __auto)
+        await self.adb.do(cmd, paras=[values], table=self.table.table_name)
+
+    async def update(self, exp: Exp, data: dict = {}, **kwargs) -> None:
+        """
+        Update the table, same arguments as `Table.update()`.
+        """
+        if not data:
+            data = kwargs
+
+        cmds, paras = self.table._update_cmds(exp, data)
+        await self.adb.do(*cmds, paras=paras, table=self.table.table_name)
@@ -0,0 +1,118 @@
+"""
+MercurySQL.gensql.cache
+=======================
+This file offers the caches used by `DataBase`, to avoid building the same things again and again.
+
+Classes
+-------
+- `LRUCache`: A bounded, thread-safe Least-Recently-Used cache, with hit/miss counters.
+- `CompiledSQL`: A sql command which is already compiled for a driver (payload replaced).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class CompiledSQL(str):
+    """
+    [Helper Class]
+    A sql command whose payload (`___!!!PAYLOAD!!!___`) is already replaced by the driver's.
+
+    It is a plain `str` for the drivers, `DataBase` just skips the replacement for it.
+    """
+
+    __slots__ = ()
+
+
+class LRUCache:
+    """
+    A bounded cache, drops the least recently used item when it's full.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        cache = LRUCache(maxsize=1024)
+        sql = cache.get(('insert', 'test', ('id', 'name')), lambda: build_sql())
+        cache.stats()   # {'hits': 0, 'misses': 1, 'size': 1, 'maxsize': 1024}
+
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        :param maxsize: The max number of items to keep, `0` to disable the cache.
+        :type maxsize: int
+        """
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, build: Callable[[], Any] = None) -> Any:
+        """
+        Get the cached value of `key`, or build it by `build()` and cache it.
+
+        :param key: The key of the item.
+        :type key: Hashable
+        :param build: Called (without arguments) to build the value when it's not cached. If not given, return `None` when it's not cached.
+        :type build: Callable
+
+        :return: The value.
+        """
+        with self.lock:
+            try:
+                value = self.data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if build is None:
+            return None
+
+        # build outside the lock, the worst case is building it twice
+        value = build()
+        self.put(key, value)
+
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Put an item into the cache.
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Drop all the cached items, the counters are kept.
+        """
+        with self.lock:
+            self.data.clear()
+
+    def stats(self) -> dict:
+        """
+        Get the statistics of the cache.
+
+        :return: `{'hits': ..., 'misses': ..., 'size': ..., 'maxsize': ...}`
+        :rtype: dict
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.data),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self.data)
@@ -0,0 +1,159 @@
+"""
+MercurySQL.gensql.counter
+=========================
+This file offers the `Counter` class, a write-behind buffer for counters. Can be got by `table.counter()`.
+
+Classes
+-------
+- `Counter`: Adds up increments per key in memory, and writes them into the table in batches.
+"""
+
+import atexit
+import threading
+from concurrent.futures import Future
+
+from ..errors import *
+
+
+class Counter:
+    """
+    A write-behind buffer for counters (views, likes, etc.).
+
+    Increments are added up per key in memory, then written as one `executemany()` upsert
+    (`value = value + n`, or insert the key with `n`), when:
+      - there are `max_pending` keys waiting.
+      - every `interval` seconds.
+      - `flush()` / `close()` is called, or the program exits.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        views = db['posts'].counter('id', 'views', interval=0.5)
+        views.incr(42)
+        views.incr(43, 5)
+
+        views.flush()   # read-your-writes: all the increments above are committed
+        db['posts'].first(db['posts']['id'] == 42)['views']
+
+    .. note::
+       `key_column` must be unique (E.g., the primary key), and increments not flushed yet are not visible to queries.
+    """
+
+    def __init__(self, table, key_column: str, value_column: str, max_pending: int = 1000, interval: float = 1.0):
+        """
+        :param table: The table of the counters.
+        :type table: Table
+        :param key_column: The (unique) column to find the row.
+        :type key_column: str
+        :param value_column: The column to add to.
+        :type value_column: str
+        :param max_pending: Flush when this number of keys are waiting.
+        :type max_pending: int
+        :param interval: Flush every `interval` seconds, `0` to disable the timer.
+        :type interval: float
+        """
+        for col in (key_column, value_column):
+            if col not in table.columns:
+                raise NotExistsError(f"Column `{col}` not exists.")
+
+        self.table = table
+        self.max_pending = max_pending
+        self.interval = interval
+
+        self.cmd = table.db.compile(
+            ("increment", table.table_name, key_column, value_column),
+            lambda: table.driver.APIs.gensql.increment(
+                table.table_name, key_column, value_column,
+                "___!!!PAYLOAD!!!___, ___!!!PAYLOAD!!!___",
+            ),
+        )
+
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.last = None    # the future of the last flush
+        self.error = None   # error of a background flush, raised by the next `flush()`
+        self.closed = threading.Event()
+
+        if interval > 0:
+            self.timer = threading.Thread(target=self._tick, daemon=True)
+            self.timer.start()
+
+        atexit.register(self.close)
+
+    def incr(self, key, n=1) -> None:
+        """
+        Add `n` to the counter of `key`.
+
+        :param key: The value of `key_column`.
+        :param n: The number to add, can be negative.
+        """
+        with self.lock:
+            self.pending[key] = self.pending.get(key, 0) + n
+            full = len(self.pending) >= self.max_pending
+
+        if full:
+            self.flush(wait=False)
+
+    def flush(self, wait: bool = True) -> Future:
+        """
+        Write all the pending increments.
+
+        :param wait: Wait until they (and all the flushes before) are committed.
+        :type wait: bool
+
+        :return: The future of the flush, or `None` if nothing has been flushed.
+        :rtype: concurrent.futures.Future
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+
+            if pending:
+                self.last = self.table.db.executemany_async(
+                    self.cmd, list(pending.items()), table=self.table.table_name
+                )
+                self.last.add_done_callback(self._done)
+            last = self.last
+
+        if wait:
+            # the CommandQueue executes in order, so the last flush is the barrier
+            if last is not None:
+                last.result()
+
+            error, self.error = self.error, None
+            if error is not None:
+                raise error
+
+        return last
+
+    def close(self) -> None:
+        """
+        Stop the timer and flush all the pending increments.
+        """
+        if self.closed.is_set():
+            return
+
+        self.closed.set()
+        atexit.unregister(self.close)
+        self.flush()
+
+    def _done(self, future: Future) -> None:
+        """
+        [Helper] Keep the error of a flush, nobody may be waiting for it.
+        """
+        if future.exception() is not None:
+            self.error = future.exception()
+
+    def _tick(self) -> None:
+        """
+        [Helper] The timer thread, flush every `interval` seconds.
+        """
+        while not self.closed.wait(self.interval):
+            if self.pending:
+                self.flush(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -8,18 +8,25 @@ This file contains the DataBase class, and a tool function `set_driver` as well.
 Classes
 -------
 - `DataBase`: Represents a SQL database and provides methods for creating tables, executing SQL commands, and retrieving table objects.
+- `TableMap`: The mapping from table name to `Table` of a DB, loads each table lazily.
 
 Methods
 -------
 - `set_driver`: Set the default driver for the `DataBase` class.
 """
+import itertools
+import json
+import threading
 from typing import List
+from collections.abc import MutableMapping
+from concurrent.futures import Future
 
 from ..orm.command_queue import CommandQueue
 from ..drivers import BaseDriver
 from ..errors import *
 
 from .table import Table
+from .cache import LRUCache, CompiledSQL
 
 
 # ========== Class Decorations ==========
@@ -27,6 +34,10 @@ class DataBase:
     pass
 
 
+class TableMap(MutableMapping):
+    pass
+
+
 # ========= Collect Infos =========
 import os
 
@@ -74,6 +85,97 @@ def check_version(version: str) -> bool:
 
 
 # ========== Classes ==========
+class TableMap(MutableMapping):
+    """
+    [Helper Class]
+    The mapping from table name to `Table` of a DB (`db.tables`). It knows all the names up front, but builds each `Table` (with its columns) only when it's first got.
+
+    So opening a DB costs the same whatever the number of tables is, and only the used tables are loaded.
+
+    .. note::
+       It's a `MutableMapping` (not a `dict`), every way to get a table loads it, so no placeholder is ever seen.
+       Methods which need all the tables (`values()`, `items()`, `copy()`, `repr()`) load the rest of them by one catalog query.
+    """
+
+    def __init__(self, db, names: List[str], catalog: dict = None):
+        """
+        :param db: The database object.
+        :type db: DataBase
+        :param names: The names of all the tables.
+        :type names: List[str]
+        :param catalog: The columns of the tables, if known already (E.g., from the schema cache). Then no queries are needed to load the tables.
+        :type catalog: dict
+        """
+        self._tables = {name: None for name in names}  # None: not loaded yet
+        self.db = db
+        self.catalog = catalog
+        self.lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Table:
+        table = self._tables[name]
+        if table is None:
+            with self.lock:
+                table = self._tables[name]
+                if table is None:
+                    if self.catalog is not None and name in self.catalog:
+                        table = Table(self.db, name, column_info=self.catalog[name])
+                    else:
+                        table = Table(self.db, name)
+                    self._tables[name] = table
+
+        return table
+
+    def __setitem__(self, name: str, table: Table) -> None:
+        self._tables[name] = table
+
+    def __delitem__(self, name: str) -> None:
+        del self._tables[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tables
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def load_all(self) -> None:
+        """
+        Load all the tables not loaded yet, by one catalog query (see `APIs.get_catalog()`).
+        """
+        with self.lock:
+            missing = [name for name, table in self._tables.items() if table is None]
+            if not missing:
+                return
+
+            catalog = self.catalog
+            if catalog is None or any(name not in catalog for name in missing):
+                catalog = self.db.driver.APIs.get_catalog(self.db)
+
+            for name in missing:
+                self._tables[name] = Table(self.db, name, column_info=catalog.get(name, []))
+
+    def values(self):
+        self.load_all()
+        return self._tables.values()
+
+    def items(self):
+        self.load_all()
+        return self._tables.items()
+
+    def copy(self) -> dict:
+        """
+        A plain `dict` of all the tables.
+        """
+        self.load_all()
+        return dict(self._tables)
+
+    def __repr__(self) -> str:
+        self.load_all()
+        return repr(self._tables)
+
+
 class DataBase:
     """
     Select/Create/Connect a SQL database.
@@ -81,18 +183,30 @@ class DataBase:
     The instance of this class represents a SQL database, and provides methods for creating tables, executing SQL, and retrieving table objects.
     """
 
-    def __init__(self, db_name: str, driver=None, **kwargs):
+    def __init__(self, db_name: str, driver=None, cq_ops: dict = None, sql_cache: int = 1024, schema_cache: str = None, **kwargs):
         """
         Create a new database object.
 
         :param db_name: The name of the database.
         :type db_name: str
+        :param cq_ops: The options for the `CommandQueue` of this DB. E.g., `{'group_commit': True, 'max_batch': 500}`.
+        :type cq_ops: dict
+        :param sql_cache: The max number of generated sql commands to cache (see `compile()`), `0` to disable.
+        :type sql_cache: int
+        :param schema_cache: The path of a file to cache the tables & columns in. When the schema is not changed since then (checked by the driver's `schema_fingerprint()`), they are loaded from it without any introspection queries.
+        :type schema_cache: str
+
+        .. note::
+           With `cq_ops={'readers': N}`, `SELECT`s are executed on N extra connections in parallel. It doesn't work with in-memory databases (E.g., SQLite's `:memory:`), because every connection will get its own database.
 
         Example Usage:
 
         .. code-block:: python
 
             db = DataBase('test.db')
+            db = DataBase('test.db', cq_ops={'group_commit': True, 'max_linger': 0.005})
+            db = DataBase('test.db', cq_ops={'readers': 4})
+            db = DataBase('test.db', schema_cache='.test.db.schema.json')
 
         How It Works:
             - start a connection to the SQL database, using the driver specified by `driver` parameter or `set_driver()` method.
@@ -112,11 +226,19 @@ class DataBase:
 
         # self.driver = driver()  # normal way
         # self.conn_pool = ConnPool(self.driver, db_name, **kwargs)  # connection pool
-        self.cq = CommandQueue(driver, db_name, **kwargs)
+        self.cq = CommandQueue(driver, db_name, **(cq_ops or {}), **kwargs)
         # self.conn = driver.connect(db_name, **kwargs)  # normal way
         # self.cursor = self.conn.cursor()
 
         self.info = {"name": db_name}
+        self.schema_cache = schema_cache
+        self.sql_cache = LRUCache(sql_cache)
+
+        # see `setResultCache()`
+        self.result_cache = None
+        self.result_cache_rows = 0
+        self.versions = {}
+        self.clock = itertools.count(1)
 
         self.template = None
         self.template_params = {}
@@ -129,10 +251,85 @@ class DataBase:
         Gather all infomations of the database, including:
           - all tables
         """
-        self.tables = self.driver.APIs.get_all_tables(self)
-        self.tables = {tname: Table(self, tname) for tname in self.tables}
+        if self.schema_cache is not None:
+            catalog = self._load_schema_cache()
+            self.tables = TableMap(self, list(catalog), catalog)
+            return
+
+        # only the names, each table is loaded when it's first used
+        self.tables = TableMap(self, self.driver.APIs.get_all_tables(self))
+
+    def _load_schema_cache(self) -> dict:
+        """
+        [Helper] Get the catalog from the schema cache file, or from the DB (and save it) if the schema is changed.
 
-    def do(self, *sql: str, paras: List[tuple] = []):
+        The file is a JSON in the form of `{"driver": ..., "name": ..., "fingerprint": ..., "catalog": {table_name: column_info}}`.
+        It's used only by the same DB (`name`), so a file shared by mistake never gives the tables of another one.
+        """
+        fingerprint = self.driver.APIs.schema_fingerprint(self)
+
+        try:
+            with open(self.schema_cache, encoding="utf-8") as f:
+                cache = json.load(f)
+            if (
+                fingerprint is not None
+                and cache["driver"] == self.driver.__name__
+                and cache["name"] == self.info["name"]
+                and cache["fingerprint"] == fingerprint
+            ):
+                return cache["catalog"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # not cached yet, or broken
+
+        catalog = self.driver.APIs.get_catalog(self)
+
+        if fingerprint is not None:
+            cache = {
+                "driver": self.driver.__name__,
+                "name": self.info["name"],
+                "fingerprint": fingerprint,
+                "catalog": catalog,
+            }
+            try:
+                # write to a temp file then rename, so other processes never read a half-written one
+                tmp = f"{self.schema_cache}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(cache, f, default=str)
+                os.replace(tmp, self.schema_cache)
+            except OSError:
+                pass  # caching is optional
+
+        return catalog
+
+    def compile(self, key: tuple, build) -> CompiledSQL:
+        """
+        Get the compiled sql command of a statement shape, build it only when it's not cached.
+
+        :param key: The shape of the statement, E.g., `('insert', table_name, columns)`. Values should never be part of it.
+        :type key: tuple
+        :param build: Called (without arguments) to generate the sql command, which may contain the payload.
+        :type build: Callable[[], str]
+
+        :return: The sql command, payload replaced.
+        :rtype: CompiledSQL
+
+        Example Usage:
+
+        .. code-block:: python
+
+            cmd = db.compile(('delete', 'test', condition), lambda: db.driver.APIs.gensql.delete('test', condition))
+            db.sql_cache.stats()    # {'hits': ..., 'misses': ..., 'size': ..., 'maxsize': ...}
+
+        How It Works:
+            - the cache (`db.sql_cache`) is owned by this DB, so the driver is the same for all the keys.
+            - the payload is replaced once when compiling, `do()` won't replace it again for a `CompiledSQL`.
+        """
+        return self.sql_cache.get(
+            key,
+            lambda: CompiledSQL(build().replace("___!!!PAYLOAD!!!___", self.driver.payload)),
+        )
+
+    def do(self, *sql: str, paras: List[tuple] = [], readonly: bool = False, chunk: int = 0, table: str = None, atomic: bool = False):
         """
         Execute a sql command on the database.
 
@@ -140,6 +337,14 @@ class DataBase:
         :type sql: str
         :param paras: The parameters for the sql command(s).
         :type paras: List[tuple]
+        :param readonly: Whether all the commands are read-only, so they can be executed by a reader connection (see `readers` in `cq_ops`).
+        :type readonly: bool
+        :param chunk: Stream the result of the last command in chunks of this size, instead of fetching all at once. Close the returned cursor if it's not fully fetched.
+        :type chunk: int
+        :param table: The only table written by the commands. If not given, commands not `readonly` are considered to write all the tables (see `setResultCache()`).
+        :type table: str
+        :param atomic: Execute all the commands as one, so either all or none of them are applied, and no other command runs between them.
+        :type atomic: bool
 
         :return: The cursor of the database.
         :rtype: Driver.Cursor
@@ -162,26 +367,25 @@ class DataBase:
         How It Works:
             - execute sql commands one by one, with parameters
             - commit after all commands are executed
+            - with `atomic`, they are sent to the `CommandQueue` as one command, and executed in a savepoint
         """
-        # Recommended to use `db.do(sql1, sql2)` instead of `db.do([sql1, sql2])`.
-        if isinstance(sql[0], list):
-            sql = sql[0]
-
-        if len(paras) < len(sql):
-            paras += [()] * (len(sql) - len(paras))
-
         # start a new cursor
         # c = self.conn.cursor()    # normal way
         # c = self.conn_pool.get_cursor()   # connection pool
         c = self.cq.get_cursor()
 
         # for each sql command
-        for i in range(len(sql)):
-            cmd = sql[i].replace(
-                "___!!!PAYLOAD!!!___", self.driver.payload
-            )  # replace payload
-
-            c.execute(cmd, paras[i])
+        commands = list(self._commands(sql, paras))
+        try:
+            if atomic:
+                c.result = c.submit(commands, script=True).result()
+            else:
+                for i, (cmd, para) in enumerate(commands):
+                    last = i == len(commands) - 1
+                    c.execute(cmd, para, readonly=readonly, chunk=chunk if last else 0)
+        finally:
+            if not readonly:
+                self._bump(table)
 
         # commit changes
         # try:
@@ -192,6 +396,242 @@ class DataBase:
 
         return c
 
+    def do_many_async(self, *sql: str, paras: List[tuple] = [], readonly: bool = False, chunk: int = 0, table: str = None) -> List[Future]:
+        """
+        Put sql command(s) into the queue without waiting, same arguments as `do()`.
+
+        :param sql: The sql command(s).
+        :type sql: str
+        :param paras: The parameters for the sql command(s).
+        :type paras: List[tuple]
+        :param readonly: Whether all the commands are read-only.
+        :type readonly: bool
+        :param chunk: Stream the result of the last command, its future will be resolved with a `CQStream`.
+        :type chunk: int
+        :param table: The only table written by the commands, see `do()`.
+        :type table: str
+
+        :return: One future for each command, resolved with the fetched rows.
+        :rtype: List[concurrent.futures.Future]
+
+        Example Usage:
+
+        .. code-block:: python
+
+            db = DataBase('test.db')
+            sql = "INSERT INTO test (id, name) VALUES (?, ?)"
+            futures = db.do_many_async(*[sql] * len(rows), paras=rows)
+            futures[-1].result()    # commands are executed in order, so all of them are done
+
+        How It Works:
+            - put all the commands into the `CommandQueue` at once, the caller only waits when it needs a result.
+        """
+        c = self.cq.get_cursor()
+        commands = list(self._commands(sql, paras))
+
+        futures = [
+            c.submit(cmd, para, readonly=readonly, chunk=chunk if i == len(commands) - 1 else 0)
+            for i, (cmd, para) in enumerate(commands)
+        ]
+
+        if readonly:
+            return futures
+        return [self._written(f, table) for f in futures]
+
+    def executemany(self, sql: str, paras: List[tuple], table: str = None):
+        """
+        Execute one sql command for each parameter tuple, in one transaction.
+
+        :param sql: The sql command.
+        :type sql: str
+        :param paras: The parameters, one tuple for each execution.
+        :type paras: List[tuple]
+        :param table: The only table written by the command, see `do()`.
+        :type table: str
+
+        :return: The cursor of the database, `cursor.rowcount` is the number of rows affected.
+        :rtype: Driver.Cursor
+
+        Example Usage:
+
+        .. code-block:: python
+
+            db = DataBase('test.db')
+            db.executemany("INSERT INTO test (id, name) VALUES (?, ?)", [(1, 'Bernie'), (2, 'Huang')])
+
+        How It Works:
+            - send the command and all the parameters to the `CommandQueue` at once, which runs them by the driver's `cursor.executemany()`, and commits once.
+        """
+        c = self.cq.get_cursor()
+        try:
+            c.executemany(self._payload(sql), paras)
+        finally:
+            self._bump(table)
+
+        return c
+
+    def executemany_async(self, sql: str, paras: List[tuple], table: str = None) -> Future:
+        """
+        Same as `executemany()`, but without waiting.
+
+        :return: A future, resolved with the number of rows affected after all the executions are committed.
+        :rtype: concurrent.futures.Future
+        """
+        c = self.cq.get_cursor()
+
+        return self._written(c.submit(self._payload(sql), paras, many=True), table)
+
+    def executemany_atomic_async(self, commands: List[tuple], table: str = None) -> Future:
+        """
+        Same as `executemany_async()`, but for several sql commands, which are executed as one command: all or nothing, and no other command runs between them.
+
+        :param commands: The `(sql, paras)` pairs, `paras` is a list of parameter tuples for each sql.
+        :type commands: List[tuple]
+        :param table: The only table written by the commands, see `do()`.
+        :type table: str
+
+        :return: A future, resolved with the total number of rows affected after all the executions are committed.
+        :rtype: concurrent.futures.Future
+
+        Example Usage:
+
+        .. code-block:: python
+
+            db = DataBase('test.db')
+            db.executemany_atomic_async([
+                ("UPDATE test SET name = ? WHERE id = ?", [('Bernie', 1), ('Huang', 2)]),
+                ("UPDATE test SET age = ? WHERE id = ?", [(18, 3)]),
+            ]).result()
+        """
+        c = self.cq.get_cursor()
+        commands = [(self._payload(sql), paras) for sql, paras in commands]
+
+        return self._written(c.submit(commands, many=True, script=True), table)
+
+    def setResultCache(self, maxsize: int = 1024, max_rows: int = 10000) -> None:
+        """
+        Cache the results of queries made by `Table` / `Exp` (select, first, exists, count, ...), so the same query with the same parameters doesn't touch the `CommandQueue` again.
+
+        :param maxsize: The max number of results to keep, `0` to disable the cache.
+        :type maxsize: int
+        :param max_rows: Results with more rows than this are not cached.
+        :type max_rows: int
+
+        Example Usage:
+
+        .. code-block:: python
+
+            db = DataBase('test.db')
+            db.setResultCache(4096)
+            db['countries'].first(db['countries']['code'] == 'CN')    # cached until `countries` is written
+            db.result_cache.stats()
+
+        How It Works:
+            - each table has a write version, bumped after every write to it through this DB: `Table` / `Exp` methods and DDL.
+            - the versions are part of the cache key, so a result is never got after a write to its table. Old results are just never hit again, and dropped by the LRU.
+            - `db.do()` without `readonly` (or `table`) is considered to write all the tables.
+
+        .. warning::
+           Writes made by other processes / connections can't be seen, so only use it for tables written through this DB.
+        """
+        self.result_cache = LRUCache(maxsize) if maxsize > 0 else None
+        self.result_cache_rows = max_rows
+
+    def _read(self, table: str, cmd: str, paras: tuple) -> list:
+        """
+        [Helper] Execute a read-only command of a table, return the fetched rows. Use the result cache if it's enabled.
+        """
+        if self.result_cache is None:
+            return self.do(cmd, paras=[paras], readonly=True).fetchall()
+
+        return self._read_async(table, cmd, paras).result()
+
+    def _read_async(self, table: str, cmd: str, paras: tuple) -> Future:
+        """
+        [Helper] Same as `_read()`, but without waiting. Return a future of the fetched rows (already resolved if it's cached).
+        """
+        cache = self.result_cache
+        if cache is None:
+            return self.do_many_async(cmd, paras=[paras], readonly=True)[-1]
+
+        # versions are got before reading: if a write ends meanwhile, the result won't be hit again
+        versions = self.versions
+        key = (cmd, paras, versions.get("*", 0), versions.get(table, 0))
+
+        try:
+            rows = cache.get(key)
+        except TypeError:  # unhashable parameters
+            return self.do_many_async(cmd, paras=[paras], readonly=True)[-1]
+
+        res = Future()
+        if rows is not None:
+            res.set_result(rows)
+            return res
+
+        def done(f: Future):
+            # cache it before anyone waiting for it gets the result
+            if f.exception() is not None:
+                res.set_exception(f.exception())
+                return
+
+            rows = f.result()
+            if len(rows) <= self.result_cache_rows:
+                cache.put(key, rows)
+            res.set_result(rows)
+
+        self.do_many_async(cmd, paras=[paras], readonly=True)[-1].add_done_callback(done)
+        return res
+
+    def _bump(self, table: str = None) -> None:
+        """
+        [Helper] Bump the write version of a table (or all the tables), after it's written.
+        """
+        if self.result_cache is not None:
+            # `next()` of a counter is atomic, no lock needed
+            self.versions[table or "*"] = next(self.clock)
+
+    def _written(self, future: Future, table: str = None) -> Future:
+        """
+        [Helper] Bump the write version when a write command is done, before anyone waiting for it gets the result.
+        """
+        if self.result_cache is None:
+            return future
+
+        res = Future()
+
+        def done(f: Future):
+            self._bump(table)
+            if f.exception() is not None:
+                res.set_exception(f.exception())
+            else:
+                res.set_result(f.result())
+
+        future.add_done_callback(done)
+        return res
+
+    def _commands(self, sql: tuple, paras: List[tuple]):
+        """
+        [Helper] Pair each sql command (payload replaced) with its parameters.
+        """
+        # Recommended to use `db.do(sql1, sql2)` instead of `db.do([sql1, sql2])`.
+        if isinstance(sql[0], list):
+            sql = sql[0]
+
+        if len(paras) < len(sql):
+            paras = list(paras) + [()] * (len(sql) - len(paras))
+
+        for i in range(len(sql)):
+            yield self._payload(sql[i]), paras[i]
+
+    def _payload(self, sql: str) -> str:
+        """
+        [Helper] Replace the payload in the sql command, unless it's compiled already.
+        """
+        if isinstance(sql, CompiledSQL):
+            return sql
+
+        return sql.replace("___!!!PAYLOAD!!!___", self.driver.payload)
+
     def setTemplate(self, template: dict, **kwargs) -> None:
         """
         Set the template, so new table's structure will be setted to this template.
@@ -258,6 +698,12 @@ class DataBase:
 
             table = Table(self, table_name)
 
+            # created outside `Table` (E.g., by `db.do()`), found in the catalog
+            if not already_exists and not table.isEmpty:
+                already_exists = True
+                if not force:
+                    raise DuplicateError(f"Table `{table_name}` already exists.")
+
             # set template
             if not already_exists and template is not None:
                 table.struct(template, **self.template_params)
@@ -9,9 +9,11 @@ Classes
 - `Exp`: Class for constructing complex query expressions.
 """
 
-from typing import Any, Union, Tuple
+from typing import Any, Union, Tuple, List
 
 from ..errors import *
+from .row import QueryResultRow
+from .cache import LRUCache
 
 
 # ========= Class Decorations =========
@@ -23,15 +25,51 @@ class Exp(BasicExp):
     pass
 
 
+# ========= Plan Cache =========
+# compiled formulas, keyed by the shape of the expression (values are never part of it)
+_plans = LRUCache(4096)
+
+# tokens of the shape
+_VALUE = ("v",)
+_NONE = ("n",)
+
+_NULL = object()  # a `None` bound as a value
+
+
+def _bucket(n: int) -> int:
+    """
+    [Helper] The length an IN-list of `n` values is padded to: the next power of two.
+    So lists of any length share a few shapes (and cached formulas), instead of one for each length.
+    """
+    return 1 << (n - 1).bit_length() if n > 0 else 0
+
+
+def _count(node) -> int:
+    """
+    [Helper] The number of parameters of an operand.
+    """
+    if isinstance(node, BasicExp):
+        return len(node.shape()[1])
+    return 0 if node is None else 1
+
+
+class _InValues(tuple):
+    """
+    [Helper Class]
+    The (padded) values of an IN-list, waiting in the stack of `BasicExp.shape()`.
+    """
+
+    __slots__ = ()
+
+
 # ========= Classes =========
 class BasicExp:
     def __init__(self, exp1, oper="", exp2=None):
         self.exp1 = exp1
         self.oper = oper
         self.exp2 = exp2
-        self._formula = ("", ())
-
-        self.gen_formula()
+        self._formula = None     # set it manually to override the generated formula
+        self._compiled = None    # the generated formula, compiled lazily
 
     @staticmethod
     def convert(value: Any) -> Tuple[str, tuple]:
@@ -64,27 +102,140 @@ class BasicExp:
 
         return formula, paras
 
+    def operands(self) -> list:
+        """
+        [Helper] Get the operands of the expression, chains of the same `AND` / `OR` are flattened.
+        """
+        if self.oper in ("BETWEEN", "IN"):
+            return [self.exp1, *self.exp2]
+
+        if self.oper not in ("AND", "OR"):
+            return [self.exp1, self.exp2]
+
+        res = []
+        todo = [self.exp2, self.exp1]
+        while todo:
+            node = todo.pop()
+            if isinstance(node, BasicExp) and node.oper == self.oper and node._formula is None:
+                todo.append(node.exp2)
+                todo.append(node.exp1)
+            else:
+                res.append(node)
+
+        return res
+
+    def shape(self) -> Tuple[tuple, list]:
+        """
+        [Helper] Walk through the expression tree, return its shape and the values in it, in the form of `(shape, paras)`.
+
+        Expressions with the same shape share the same formula, only the values differ.
+        IN-lists of plain values are padded to the next power of two by repeating the last value (see `_bucket()`),
+        which doesn't change the result, but keeps the number of shapes small.
+        """
+        tokens = []
+        paras = []
+
+        stack = [self]
+        while stack:
+            node = stack.pop()
+
+            if isinstance(node, _InValues):
+                paras.extend(node)
+            elif isinstance(node, BasicExp):
+                if node._formula is not None:
+                    # constructed manually
+                    tokens.append(("f", node._formula[0]))
+                    paras.extend(node._formula[1])
+                elif node.oper == "":
+                    tokens.append(("r", node.exp1))
+                elif node.oper == "IN" and not any(isinstance(v, BasicExp) for v in node.exp2):
+                    values = tuple(node.exp2)
+                    n = _bucket(len(values))
+                    tokens.append(("i", n))
+                    if n:
+                        # the left side comes first, then the values
+                        stack.append(_InValues(values + values[-1:] * (n - len(values))))
+                        stack.append(node.exp1)
+                else:
+                    operands = node.operands()
+                    if node.oper == "IN":
+                        # `None` in the list is a value (NULL), not a missing operand
+                        operands[1:] = [_NULL if v is None else v for v in operands[1:]]
+                    tokens.append(("o", node.oper, len(operands)))
+                    stack.extend(reversed(operands))
+            elif node is _NULL:
+                tokens.append(_VALUE)
+                paras.append(None)
+            elif node is None:
+                tokens.append(_NONE)
+            else:
+                tokens.append(_VALUE)
+                paras.append(node)
+
+        return tuple(tokens), paras
+
+    @staticmethod
+    def plan(shape: tuple) -> str:
+        """
+        [Helper] Generate the formula of a shape (see `shape()`).
+        """
+        # tokens are in pre-order, so build it from the end: operands are always ready before their operator
+        stack = []
+        for token in reversed(shape):
+            kind = token[0]
+            if kind == "v":
+                stack.append("___!!!PAYLOAD!!!___")
+            elif kind == "n":
+                stack.append("")
+            elif kind == "i":
+                n = token[1]
+                # nothing is in an empty list
+                stack.append(f"({stack.pop()} IN ({', '.join(['___!!!PAYLOAD!!!___'] * n)}))" if n else "(0 = 1)")
+            elif kind == "o":
+                _, oper, n = token
+                operands = [stack.pop() for _ in range(n)]
+
+                if oper == "BETWEEN":
+                    stack.append(f"({operands[0]} BETWEEN {operands[1]} AND {operands[2]})")
+                elif oper == "IN":
+                    # nothing is in an empty list
+                    stack.append(f"({operands[0]} IN ({', '.join(operands[1:])}))" if n > 1 else "(0 = 1)")
+                else:
+                    stack.append("(" + f" {oper} ".join(operands) + ")")
+            else:
+                stack.append(token[1])
+
+        return stack[0]
+
     def gen_formula(self) -> None:
         """
         [Helper] Generate the formula of the expression.
 
+        How It Works:
+            - walk through the tree to get its shape and values, without building any string.
+            - the formula of the shape is got from the plan cache, so only the values are re-bound for a known shape.
+
         .. note :: You can also construct a formula by yourself, just set the `_formula` attribute to a tuple in the form of `(sql_command, paras)`.
         """
-        if self.oper == "":
-            self._formula = self.exp1, ()
-        else:
-            exp1 = BasicExp.convert(self.exp1)
-            exp2 = BasicExp.convert(self.exp2)
+        shape, paras = self.shape()
+        formula = _plans.get(shape, lambda: BasicExp.plan(shape))
 
-            self._formula = f"({exp1[0]} {self.oper} {exp2[0]})", tuple(
-                exp1[1] + exp2[1]
-            )
+        self._compiled = formula, tuple(paras)
 
     def formula(self) -> Tuple[str, tuple]:
         """
         Return the formula of the expression in the form of (sql_command, paras).
         """
-        return self._formula
+        if self._formula is not None:
+            return self._formula
+
+        if self.oper == "":
+            return self.exp1, ()
+
+        if self._compiled is None:
+            self.gen_formula()
+
+        return self._compiled
 
 
 class Exp(BasicExp):
@@ -126,23 +277,48 @@ class Exp(BasicExp):
     def between(
         self, __value1: Union[Exp, int, str], __value2: Union[Exp, int, str]
     ) -> Exp:
-        # construct a new Exp object manually: set the `_formula` attribute to `(sql, paras)`.
-        res = Exp(self, "BETWEEN", __value1)
-
-        exp1 = res.formula()
-        exp3 = BasicExp.convert(__value2)
-
-        # set the `_formula` attribute.
-        res._formula = f"({exp1[0]} AND {exp3[0]})", tuple(exp1[1] + exp3[1])
-
-        return res
+        return Exp(self, "BETWEEN", (__value1, __value2))
 
     def in_(self, __value: Union[list, tuple, set]) -> Exp:
-        return Exp(self, "IN", str(tuple(__value)))
+        """
+        Check whether the value is in the list, each item is a bound parameter.
+
+        .. note::
+           If a query has more parameters than the driver allows (`max_variables`), and the largest IN-list is a condition `AND`ed with the others,
+           the query is executed in chunks of that list automatically. See `split()`.
+           So are `exists()`, `first()` and the aggregations (`count()`, `sum()`, ...) of `Table`, but ordered / limited queries and `group_by()`
+           can't be split, they raise `NotSupportedError` instead.
+           `None` in the list is bound as `NULL`.
+        """
+        return Exp(self, "IN", tuple(__value))
 
     def like(self, __value: str) -> Exp:
         return Exp(self, "LIKE", __value)
 
+    def __add__(self, __value: Union[Exp, int, float]) -> Exp:
+        return Exp(self, "+", __value)
+
+    def __sub__(self, __value: Union[Exp, int, float]) -> Exp:
+        return Exp(self, "-", __value)
+
+    def __mul__(self, __value: Union[Exp, int, float]) -> Exp:
+        return Exp(self, "*", __value)
+
+    def __truediv__(self, __value: Union[Exp, int, float]) -> Exp:
+        return Exp(self, "/", __value)
+
+    def __radd__(self, __value: Union[int, float]) -> Exp:
+        return Exp(__value, "+", self)
+
+    def __rsub__(self, __value: Union[int, float]) -> Exp:
+        return Exp(__value, "-", self)
+
+    def __rmul__(self, __value: Union[int, float]) -> Exp:
+        return Exp(__value, "*", self)
+
+    def __rtruediv__(self, __value: Union[int, float]) -> Exp:
+        return Exp(__value, "/", self)
+
     def __and__(self, __value: Union[Exp, int, str]) -> Exp:
         return Exp(self, "AND", __value)
 
@@ -152,22 +328,184 @@ class Exp(BasicExp):
     def __invert__(self) -> Union[Exp, int, str]:
         return Exp("", "NOT", self)
 
-    def query(self, table=None, select="*") -> list:
+    def query(self, table=None, select="*", order_by="", limit=None, offset=None) -> list:
         """
         Execute query.
+        """
+        rows = []
+        for cmd, paras in self.query_cmds(table, select, order_by, limit, offset):
+            rows.extend(self.table.db._read(self.table.table_name, cmd, paras))
+
+        return rows
+
+    def first(self, table=None, select="*", order_by="") -> Union[QueryResultRow, None]:
+        """
+        Get the first matched row (by `LIMIT 1`), or `None` if no rows match.
+
+        :param order_by: The `ORDER BY` list in SQL, see `query_cmd()`.
+        :type order_by: str
+
+        :return: The first row.
+        :rtype: QueryResultRow | None
+
+        Example Usage:
+
+        .. code-block:: python
+
+            row = (tb['name'] == 'Bernie').first()
+
         """
         self.table = table or self.table
 
         if self.table is None:
             raise NotSpecifiedError("Table not specified.")
-        
+
+        # any row will do, so the parts can be tried one by one
+        for part in ([self] if order_by else self.split()):
+            cmd, paras = part.query_cmd(self.table, select, order_by, limit=1)
+
+            rows = self.table.db._read(self.table.table_name, cmd, paras)
+            if rows:
+                keys = self.table._selection_keys(select)
+                return QueryResultRow(rows[0], {key: i for i, key in enumerate(keys)})
+
+        return None
+
+    def query_cmds(self, table=None, select="*", order_by="", limit=None, offset=None) -> List[Tuple[str, tuple]]:
+        """
+        Same as `query_cmd()`, but split into several commands if there are too many parameters (see `split()`).
+        An ordered / limited query can't be split, as the parts can't be ordered / limited as a whole, so `NotSupportedError` is raised if it's too large.
+        """
+        self.table = table or self.table
+
+        if self.table is None:
+            raise NotSpecifiedError("Table not specified.")
+
+        if order_by or limit is not None or offset is not None:
+            self.check_size()
+            return [self.query_cmd(self.table, select, order_by, limit, offset)]
+
+        return [part.query_cmd(self.table, select) for part in self.split()]
+
+    def split(self, reserved: int = 0) -> List[Exp]:
+        """
+        Split the expression by its largest IN-list, so that each part has no more parameters than the driver allows.
+
+        :param reserved: The number of parameters used by the other parts of the command. E.g., the `SET` values of an update.
+        :type reserved: int
+
+        :return: The parts, rows matched by them are disjoint. Or `[self]` if no need (or not able) to split.
+        :rtype: List[Exp]
+
+        Example Usage:
+
+        .. code-block:: python
+
+            exp = (tb['id'].in_(range(100000))) & (tb['age'] > 18)
+            exp.split()     # [(id IN (0, ..., 32764)) AND (age > 18), ...]
+
+        How It Works:
+            - only an IN-list that is the whole condition, or one of the `AND`ed conditions, can be split.
+            - duplicated values are removed first, so no row is matched by two parts.
+        """
+        if self.table is None:
+            raise NotSpecifiedError("Table not specified.")
+
+        limit = self.table.db.driver.max_variables - reserved
+        _, paras = self.formula()
+        if len(paras) <= limit:
+            return [self]
+
+        conjuncts = self.operands() if self.oper == "AND" and self._formula is None else [self]
+        lists = [
+            c for c in conjuncts
+            if isinstance(c, BasicExp) and c.oper == "IN" and c._formula is None
+        ]
+        if not lists:
+            return [self]
+
+        big = max(lists, key=lambda c: len(c.exp2))
+        others = sum(_count(c) for c in conjuncts if c is not big) + _count(big.exp1)
+        if limit - others <= 0:
+            return [self]
+        # a power of two, so the padded chunks (see `shape()`) still fit
+        size = 1 << ((limit - others).bit_length() - 1)
+
+        try:
+            values = list(dict.fromkeys(big.exp2))
+        except TypeError:  # unhashable
+            values = list(big.exp2)
+
+        parts = []
+        for i in range(0, len(values), size):
+            chunk = Exp(big.exp1, "IN", tuple(values[i:i + size]))
+
+            part = None
+            for c in conjuncts:
+                c = chunk if c is big else c
+                part = c if part is None else Exp(part, "AND", c)
+
+            part.table = self.table
+            parts.append(part)
+
+        return parts
+
+    def check_size(self, reserved: int = 0) -> None:
+        """
+        Raise `NotSupportedError` if the expression has more parameters than the driver allows, for commands which can't be split (see `split()`).
+        E.g., ordered / limited queries, and `group_by()`.
+        """
+        n = len(self.formula()[1]) + reserved
+        if n > self.table.db.driver.max_variables:
+            raise NotSupportedError(
+                f"Too many parameters ({n} > {self.table.db.driver.max_variables}) for one command, and this command can't be split. "
+                f"Use a shorter IN-list, or an unordered / unlimited query which is split automatically."
+            )
+
+    def query_cmd(self, table=None, select="*", order_by="", limit=None, offset=None) -> Tuple[str, tuple]:
+        """
+        Generate the query command without executing it, in the form of `(sql_command, paras)`.
+        The command is compiled (payload replaced) and cached by the DB, see `DataBase.compile()`.
+
+        :param order_by: The `ORDER BY` list in SQL, E.g., `name, age DESC` (see `Table.select()`).
+        :type order_by: str
+        :param limit: The max number of rows to get.
+        :type limit: int
+        :param offset: The number of rows to skip.
+        :type offset: int
+        """
+        self.table = table or self.table
+
+        if self.table is None:
+            raise NotSpecifiedError("Table not specified.")
+
         self.driver = self.table.db.driver
 
         condition, paras = self.formula()
 
-        cmd = self.driver.APIs.gensql.query(self.table.table_name, select, condition)
-        res = self.table.db.do(cmd, paras=[paras])
-        return res.fetchall()
+        table_name = self.table.table_name
+        limited = limit is not None
+        skipped = offset is not None
+
+        def build():
+            if not (order_by or limited or skipped):
+                return self.driver.APIs.gensql.query(table_name, select, condition)
+
+            return self.driver.APIs.gensql.query(
+                table_name, select, condition,
+                order_by=order_by,
+                limit="___!!!PAYLOAD!!!___" if limited else "",
+                offset="___!!!PAYLOAD!!!___" if skipped else "",
+            )
+
+        cmd = self.table.db.compile(("query", table_name, select, condition, order_by, limited, skipped), build)
+
+        if limited:
+            paras = paras + (limit,)
+        if skipped:
+            paras = paras + (offset,)
+
+        return cmd, paras
 
     def delete(self, table=None) -> None:
         """
@@ -180,10 +518,17 @@ class Exp(BasicExp):
         
         self.driver = self.table.db.driver
 
-        condition, paras = self.formula()
+        table_name = self.table.table_name
+        cmds, paras = [], []
+        for part in self.split():
+            condition, para = part.formula()
+            cmds.append(self.table.db.compile(
+                ("delete", table_name, condition),
+                lambda: self.driver.APIs.gensql.delete(table_name, condition),
+            ))
+            paras.append(para)
 
-        cmd = self.driver.APIs.gensql.delete(self.table.table_name, condition)
-        self.table.db.do(cmd, paras=[paras])
+        self.table.db.do(*cmds, paras=paras, table=table_name)
 
 
     def update(self, data, /, table=None) -> None:
@@ -198,14 +543,14 @@ class Exp(BasicExp):
     def __iter__(self):
         """
         use magic method `__iter__` to search.
+        It queries every time, to cache the results, see `DataBase.setResultCache()`.
         """
-        if self.result is None:
-            if self.table is None:
-                raise NotSpecifiedError("Table not specified.")
-            
-            data = self.query()
-            keys = self.table.columns
-            self.result = [dict(zip(keys, row)) for row in data]
+        if self.table is None:
+            raise NotSpecifiedError("Table not specified.")
+
+        data = self.query()
+        index = {key: i for i, key in enumerate(self.table.columns)}
+        self.result = [QueryResultRow(row, index) for row in data]
 
         return iter(self.result)
 
@@ -0,0 +1,178 @@
+"""
+MercurySQL.gensql.rebuild
+=========================
+This file offers the `Rebuild` class, which rebuilds a table online (without blocking the other writers for the whole copy).
+Used by `table.setPrimaryKey()` and `table.delColumn()`.
+
+Classes
+-------
+- `Rebuild`: Copies a table into a new structure chunk by chunk, and swaps them at the end.
+"""
+
+import re
+from typing import Callable, List
+
+from ..errors import *
+
+
+class Rebuild:
+    """
+    Rebuild a table with new columns / a new primary key, online.
+
+    The old table keeps serving reads and writes until the (short) swap at the end:
+      - create the new table, and triggers on the old one which copy every insert / update / delete into it.
+      - copy the existing rows in chunks of `chunk_size` rows (ordered by row id), each chunk is its own command (transaction),
+        so the other commands in the `CommandQueue` run between them.
+      - check that no rows are merged by the new primary key (`ConfilictError`).
+      - swap the tables (and create the indexes & triggers again) in one atomic command.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        Rebuild(
+            db['test'], [('id', 'INTEGER'), ('name', 'TEXT')], primaryKey='id',
+            progress=lambda copied, total: print(f"{copied}/{total}"),
+        ).run()
+
+    .. note::
+       The new table is generated from the definition of the old one, so the constraints (E.g., `NOT NULL`, `UNIQUE`, `CHECK`, defaults) are kept.
+       The triggers on the table are created again after the swap, and the views using it keep working.
+       If that's not possible (E.g., a removed column is used by a `CHECK`, a trigger or a view), `run()` raises `NotSupportedError` before doing anything.
+    """
+
+    def __init__(
+        self,
+        table,
+        columns: List[tuple],
+        primaryKey: str = None,
+        chunk_size: int = 10000,
+        progress: Callable[[int, int], None] = None,
+        indexes: Callable[[str], bool] = None,
+    ):
+        """
+        :param table: The table to rebuild.
+        :type table: Table
+        :param columns: The `(name, type)` of each column of the new table, all of them should exist in the old table.
+        :type columns: List[tuple]
+        :param primaryKey: The primary key of the new table. If not given, the row ids are kept.
+        :type primaryKey: str
+        :param chunk_size: The number of rows copied by each command.
+        :type chunk_size: int
+        :param progress: Called with `(copied rows, total rows)` after each chunk.
+        :type progress: Callable[[int, int], None]
+        :param indexes: Called with the name of each index of the old table, whether to create it on the new table. Default is all of them.
+        :type indexes: Callable[[str], bool]
+        """
+        if not table.driver.online_rebuild:
+            raise NotSupportedError(f"Online rebuild is not supported by {table.driver.__name__}.")
+
+        self.table = table
+        self.db = table.db
+        self.gensql = table.driver.APIs.gensql
+
+        self.columns = columns
+        self.names = [name for name, _ in columns]
+        self.primaryKey = primaryKey
+        self.chunk_size = max(1, chunk_size)
+        self.progress = progress
+        self.keep_index = indexes or (lambda name: True)
+
+        self.new_table = f"___rebuild_{table.table_name}"
+
+    def run(self) -> None:
+        """
+        Rebuild the table, return after the swap.
+        If anything fails, the new table is dropped and the old one is left as it was.
+        """
+        table_name = self.table.table_name
+
+        table_sql = self.db.do(self.gensql.get_table_sql(table_name), readonly=True).fetchone()[0]
+        create = self.gensql.rebuild_create(table_name, table_sql, self.new_table, self.columns, self.primaryKey)
+        if create is None or self._uses_removed():
+            raise NotSupportedError(f"Table `{table_name}` can't be rebuilt without losing its constraints.")
+
+        # left by a crashed rebuild
+        self.db.do(*self.gensql.rebuild_drop(self.new_table), table=self.new_table)
+
+        try:
+            self.db.do(
+                *create,
+                *self.gensql.rebuild_triggers(table_name, self.new_table, self.names, self.primaryKey),
+                atomic=True,
+                table=self.new_table,
+            )
+
+            # rows written from now on are copied by the triggers
+            self._copy(*self.db.do(self.gensql.rebuild_range(table_name), readonly=True).fetchone())
+
+            # the triggers keep both tables in step, unless rows are merged by the new primary key
+            old, new = self.db.do(self.gensql.rebuild_count(table_name, self.new_table), readonly=True).fetchone()
+            if old != new:
+                raise ConfilictError(
+                    f"Column `{self.primaryKey}` has duplicated values ({old - new} rows), can't be the primary key."
+                )
+
+            indexes = [
+                sql for name, sql in self.db.do(self.gensql.get_index_sql(table_name), readonly=True).fetchall()
+                if self.keep_index(name)
+            ]
+            triggers = [sql for _, sql in self.db.do(self.gensql.get_trigger_sql(table_name), readonly=True).fetchall()]
+            self.db.do(*self.gensql.rebuild_swap(table_name, self.new_table, indexes, triggers), atomic=True)
+        except Exception:
+            self.db.do(*self.gensql.rebuild_drop(self.new_table), table=self.new_table)
+            raise
+
+    def _uses_removed(self) -> bool:
+        """
+        [Helper] Whether a removed column is used by an index / trigger kept after the rebuild, or by a view of the table.
+        They would be broken by the rebuild, while `ALTER TABLE ... DROP COLUMN` refuses to break them.
+        """
+        removed = [col for col in self.table.columns if col not in self.names]
+        if not removed:
+            return False
+
+        table_name = self.table.table_name
+        used = re.compile(rf"\b({'|'.join(map(re.escape, removed))})\b", re.IGNORECASE)
+        sqls = [sql for name, sql in self.db.do(self.gensql.get_index_sql(table_name), readonly=True).fetchall() if self.keep_index(name)]
+        sqls += [sql for _, sql in self.db.do(self.gensql.get_trigger_sql(table_name), readonly=True).fetchall()]
+        sqls += [
+            sql for _, sql in self.db.do(self.gensql.get_view_sql(), readonly=True).fetchall()
+            if re.search(rf"\b{re.escape(table_name)}\b", sql, re.IGNORECASE)
+        ]
+
+        return any(used.search(sql) for sql in sqls)
+
+    def _copy(self, total: int, lower: int, upper: int) -> None:
+        """
+        [Helper] Copy the rows whose row id is in `[lower, upper]` chunk by chunk.
+        """
+        if not total:
+            if self.progress is not None:
+                self.progress(0, 0)
+            return
+
+        bound = self.db.compile(
+            ("rebuild_bound", self.table.table_name),
+            lambda: self.gensql.rebuild_bound(self.table.table_name, "___!!!PAYLOAD!!!___", "___!!!PAYLOAD!!!___"),
+        )
+        copy = self.db.compile(
+            ("rebuild_copy", self.table.table_name, tuple(self.names), self.primaryKey),
+            lambda: self.gensql.rebuild_copy(
+                self.table.table_name, self.new_table, self.names, self.primaryKey,
+                "___!!!PAYLOAD!!!___", "___!!!PAYLOAD!!!___",
+            ),
+        )
+
+        copied = 0
+        lower -= 1
+        while lower < upper:
+            row = self.db.do(bound, paras=[(lower, self.chunk_size - 1)], readonly=True).fetchone()
+            end = upper if row is None else min(row[0], upper)
+
+            self.db.do(copy, paras=[(lower, end)], table=self.new_table)
+
+            lower = end
+            copied = min(copied + self.chunk_size, total)
+            if self.progress is not None:
+                self.progress(total if lower >= upper else copied, total)
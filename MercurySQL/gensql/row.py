@@ -0,0 +1,125 @@
+"""
+MercurySQL.gensql.row
+=====================
+This file offers the `QueryResultRow` class, the compact row type of query results.
+
+Classes
+-------
+- `QueryResultRow`: Represents a single row of a query result, backed by the fetched tuple.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+
+class QueryResultRow:
+    """
+    [Helper Class]
+    Representing a single row of the query result.
+
+    It keeps the fetched tuple as it is, and shares one `{column_name: index}` map with all the other rows of the same result.
+    So it costs nearly nothing more than the tuple itself.
+
+    Example Usage:
+
+    .. code-block:: python
+
+        res = table.select(exp)
+        row = res[0]
+        row.id          # by attribute
+        row['id']       # by column name
+        row[0]          # by index
+        dict(row)       # {'id': 1, 'name': 'Bernie'}
+
+    .. note::
+       It works like a (read-only) `dict`: iterating through it gives the column names, and it equals to the `dict` with the same items.
+       But it is not a `dict` subclass (it's a registered `Mapping`): `isinstance(row, dict)` is False, and `json` can't serialize it.
+       Use `row.as_dict()` (or `QueryResult.as_dicts()`) to get plain `dict`s, E.g., `json.dumps(res.as_dicts())`.
+    """
+
+    __slots__ = ("_values", "_index")
+
+    def __init__(self, values: tuple, index: dict):
+        """
+        :param values: The fetched row.
+        :type values: tuple
+        :param index: The map from column name to its position in `values`, shared by all the rows of a result.
+        :type index: dict
+        """
+        self._values = values
+        self._index = index
+
+    def __getitem__(self, key) -> Any:
+        """
+        Get the value of a column, by its name or its index.
+
+        :param key: The name or the index of the column.
+        :type key: str | int | slice
+
+        :return: The value of the column.
+        """
+        try:
+            return self._values[self._index[key]]
+        except (KeyError, TypeError):
+            # not a column name: by index (or raise the error for the missing column)
+            if isinstance(key, (int, slice)):
+                return self._values[key]
+            raise
+
+    def __getattr__(self, name: str) -> Any:
+        # only called when the normal lookup fails, so slots & methods come first
+        if name in QueryResultRow.__slots__:
+            raise AttributeError(name)
+
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            raise AttributeError(f"Column `{name}` not exists.") from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get the value of a column, return `default` if column not exists.
+        """
+        i = self._index.get(key)
+        return default if i is None else self._values[i]
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self) -> tuple:
+        return self._values
+
+    def items(self):
+        return zip(self._index.keys(), self._values)
+
+    def as_dict(self) -> dict:
+        """
+        Convert the row into a new `dict`.
+        """
+        return dict(zip(self._index.keys(), self._values))
+
+    copy = as_dict  # same as `dict.copy()`, a new (mutable) `dict`
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, QueryResultRow):
+            return self._values == other._values and list(self._index) == list(other._index)
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.as_dict())
+
+
+Mapping.register(QueryResultRow)
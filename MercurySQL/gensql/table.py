@@ -7,11 +7,18 @@ Classes
 -------
 - `Table`: Represents a table in the SQL database and provides methods for adding columns, deleting columns, inserting rows, and executing queries.
 - `QueryResult`: Represents the result of a query and provides methods for accessing the query results.
+- `QueryResultRow`: (from `row.py`) Represents a single row of a query result.
+- `GroupBy`: Represents the rows of a table grouped by column(s), and aggregates them.
 """
 
-from typing import Any
+from typing import Any, Callable, List, Union
+from concurrent.futures import Future
+
 from ..errors import *
 from .exp import Exp
+from .row import QueryResultRow
+from .counter import Counter
+from .rebuild import Rebuild
 
 
 # ========== Class Decorations ==========
@@ -20,8 +27,11 @@ class Table:
 
 
 class QueryResult:
-    class QueryResultRow:
-        pass
+    pass
+
+
+class GroupBy:
+    pass
 
 
 # ========== Classes ==========
@@ -32,7 +42,7 @@ class Table:
     It provides methods for adding columns, deleting columns, inserting rows, and executing queries, etc.
     """
 
-    def __init__(self, db, table_name: str):
+    def __init__(self, db, table_name: str, column_info: list = None):
         """
         Initialize a table object.
 
@@ -40,6 +50,8 @@ class Table:
         :type db: DataBase
         :param table_name: The name of the table.
         :type table_name: str
+        :param column_info: The columns of the table, from the catalog of the DB (see `APIs.get_catalog()`). If not given, it's checked by the DB's table list (`db.tables`), and the catalog is queried only if the table is not there.
+        :type column_info: list
 
         Example Usage:
 
@@ -56,18 +68,26 @@ class Table:
         self.table_name = table_name
         self.driver = db.driver
 
-        all_tables = self.driver.APIs.get_all_tables(self.db)
-        self.isEmpty = table_name not in all_tables
+        if column_info is not None:
+            self.isEmpty = not column_info
+        elif table_name in db.tables:
+            # the DB keeps the table list up to date, no need to query it again
+            self.isEmpty = False
+        else:
+            # not known by the DB, but could be created outside `Table` (E.g., by `db.do()`), so check the catalog
+            self.isEmpty = table_name not in self.driver.APIs.get_all_tables(db)
 
-        self._gather_info()
+        self._gather_info(column_info)
 
-    def _gather_info(self):
+    def _gather_info(self, column_info: list = None):
         """
         [Helper] Gather all infomations of the table, including:
             - `columns`: list[str] .................. name of all columns
             - `columnsType`: dict[str, str] .......... the type of each column
         """
-        if not self.isEmpty:
+        if column_info is not None:
+            self.column_info = column_info
+        elif not self.isEmpty:
             self.column_info = self.driver.APIs.get_all_columns(
                 self.db, self.table_name
             )
@@ -181,7 +201,16 @@ class Table:
         """
         self.delColumn(key)
 
-    def select(self, exp: Exp = None, selection: str = "*") -> QueryResult:
+    def select(
+        self,
+        exp: Exp = None,
+        selection: str = "*",
+        batch_size: int = 1000,
+        format: str = "rows",
+        order_by: Union[str, List[str]] = None,
+        limit: int = None,
+        offset: int = None,
+    ) -> QueryResult:
         """
         Select data from the table.
 
@@ -189,6 +218,16 @@ class Table:
         :type exp: Exp
         :param selection: The columns to select, default is '*'(all columns).
         :type selection: str
+        :param batch_size: The query is executed lazily, and the rows are fetched in batches of this size when iterating (see `QueryResult`). `None` to execute it at once (a snapshot).
+        :type batch_size: int
+        :param format: `'rows'` to get a `QueryResult`, or `'columnar'` to get a mapping from column name to array (see `QueryResult.to_columns()`).
+        :type format: str
+        :param order_by: The column(s) to order by, `'-col'` for descending order.
+        :type order_by: str | List[str]
+        :param limit: The max number of rows to get.
+        :type limit: int
+        :param offset: The number of rows to skip.
+        :type offset: int
 
         :return: A list of data.
         :rtype: list
@@ -199,15 +238,360 @@ class Table:
 
             table = db['test']
             table.select(table['id'] == 1)  # select all columns where id = 1
+            table.select(batch_size=5000)   # fetch 5000 rows each time when iterating
+            table.select(batch_size=None)   # execute now, and keep all the rows
+            table.select(format="columnar") # {'id': array([1, 2, ...]), 'name': ['Bernie', ...]}
+            table.select(order_by=['-age', 'id'], limit=20, offset=40)  # the 3rd page, ordered by age (desc) then id
 
         How It Works:
-            - Construct a `QueryResult` object, which will execute the query whthin it's `QueryResult.__init__()` method.
+            - Construct a `QueryResult` object, which will execute the query when it's used (or whthin it's `QueryResult.__init__()` method, if `batch_size` is `None`).
             - return a `QueryResult` object with results.
         """
         if exp is None:
             exp = Exp(1, "=", 1)
 
-        return QueryResult(self, exp, selection)
+        clauses = {}
+        if order_by:
+            clauses["order_by"] = self._order_by(order_by)
+        if limit is not None:
+            clauses["limit"] = limit
+        if offset is not None:
+            clauses["offset"] = offset
+
+        if format == "columnar":
+            # filled straight from the cursor batches
+            batch_size = batch_size or 10000
+            return QueryResult(self, exp, selection, batch_size=batch_size, **clauses).to_columns(batch_size)
+        elif format != "rows":
+            raise NotSupportedError(f"Format `{format}` not supported.")
+
+        return QueryResult(self, exp, selection, batch_size=batch_size, **clauses)
+
+    def paginate(self, exp: Exp = None, key: str = "id", page_size: int = 1000, selection: str = "*"):
+        """
+        Iterate through the selected rows page by page, ordered by `key`.
+
+        Each page seeks from the last key of the previous one (`WHERE key > ?`), so it's as fast as the first page,
+        while `select(offset=...)` has to scan all the skipped rows.
+
+        :param exp: The query expression.
+        :type exp: Exp
+        :param key: A unique column to order & seek by, usually the primary key. It must be selected.
+        :type key: str
+        :param page_size: The max number of rows in each page.
+        :type page_size: int
+        :param selection: The columns to select, default is '*'(all columns).
+        :type selection: str
+
+        :return: A generator of pages, each page is a `QueryResult`.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            for page in table.paginate(table['age'] > 18, key='id', page_size=100):
+                render(page)
+
+        """
+        if exp is None:
+            exp = Exp(1, "=", 1)
+
+        order_by = self._order_by(key)
+        keys = self._selection_keys(selection)
+        if key not in keys:
+            raise NotExistsError(f"Key `{key}` not selected.")
+        i = keys.index(key)
+
+        seek = exp
+        while True:
+            page = QueryResult(self, seek, selection, order_by=order_by, limit=page_size)
+            if not page.values:
+                break
+
+            yield page
+
+            if len(page.values) < page_size:
+                break
+            seek = exp & (self[key] > page.values[-1][i])
+
+    def _order_by(self, order_by: Union[str, List[str]]) -> str:
+        """
+        [Helper] Convert `order_by` of `select()` into SQL, E.g., `['-age', 'id']` -> `'age DESC, id'`.
+        """
+        if isinstance(order_by, str):
+            order_by = order_by.split(",")
+
+        res = []
+        for col in order_by:
+            col = col.strip()
+            desc = col.startswith("-")
+            if desc:
+                col = col[1:]
+
+            if col not in self.columns:
+                raise NotExistsError(f"Column `{col}` not exists.")
+
+            res.append(f"{col} DESC" if desc else col)
+
+        return ", ".join(res)
+
+    def first(self, exp: Exp = None, selection: str = "*", order_by: Union[str, List[str]] = None) -> Union[QueryResultRow, None]:
+        """
+        Get the first row matching the expression, without building a `QueryResult`.
+
+        :param exp: The query expression, default is all rows.
+        :type exp: Exp
+        :param selection: The columns to select, default is '*'(all columns).
+        :type selection: str
+        :param order_by: The column(s) to order by, same as `select()`.
+        :type order_by: str | List[str]
+
+        :return: The first row, or `None` if no rows match.
+        :rtype: QueryResultRow | None
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            user = table.first(table['id'] == 1)
+            oldest = table.first(order_by='-age')
+
+        """
+        if exp is None:
+            exp = Exp(1, "=", 1)
+
+        return exp.first(self, selection, self._order_by(order_by) if order_by else "")
+
+    def exists(self, exp: Exp = None) -> bool:
+        """
+        Check whether any row matches the expression, by `SELECT EXISTS(...)`.
+
+        :param exp: The query expression, default is all rows.
+        :type exp: Exp
+
+        :return: Whether there is such a row.
+        :rtype: bool
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            if table.exists(table['name'] == 'Bernie'):
+                ...
+
+        """
+        if exp is None:
+            exp = Exp(1, "=", 1)
+        exp.table = exp.table or self
+
+        # too many parameters, any part will do
+        for part in exp.split():
+            condition, paras = part.formula()
+
+            cmd = self.db.compile(
+                ("exists", self.table_name, condition),
+                lambda: self.driver.APIs.gensql.exists(self.table_name, condition),
+            )
+
+            if self.db._read(self.table_name, cmd, paras)[0][0]:
+                return True
+
+        return False
+
+    def counter(self, key_column: str, value_column: str, max_pending: int = 1000, interval: float = 1.0) -> Counter:
+        """
+        Get a write-behind buffer for counters in this table, see `Counter`.
+
+        :param key_column: The (unique) column to find the row, usually the primary key.
+        :type key_column: str
+        :param value_column: The column to add to.
+        :type value_column: str
+        :param max_pending: Flush when this number of keys are waiting.
+        :type max_pending: int
+        :param interval: Flush every `interval` seconds, `0` to disable the timer.
+        :type interval: float
+
+        :return: A `Counter` object.
+        :rtype: Counter
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['posts']
+            views = table.counter('id', 'views')
+            views.incr(42)
+            views.flush()
+
+        """
+        return Counter(self, key_column, value_column, max_pending, interval)
+
+    def count(self, exp: Exp = None, column: str = "*") -> int:
+        """
+        Count the rows matching the expression, in SQL.
+
+        :param exp: The query expression, default is all rows.
+        :type exp: Exp
+        :param column: Only count the rows whose `column` is not `NULL`. Default is '*'(all rows).
+        :type column: str
+
+        :return: The number of rows.
+        :rtype: int
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            table.count(table['age'] > 18)
+
+        """
+        return self._aggregate_one("COUNT", column, exp)
+
+    def sum(self, column: str, exp: Exp = None) -> Any:
+        """
+        Sum a column of the rows matching the expression, in SQL. `None` if no rows.
+        """
+        return self._aggregate_one("SUM", column, exp)
+
+    def avg(self, column: str, exp: Exp = None) -> Any:
+        """
+        Average a column of the rows matching the expression, in SQL. `None` if no rows.
+        """
+        return self._aggregate_one("AVG", column, exp)
+
+    def min(self, column: str, exp: Exp = None) -> Any:
+        """
+        Get the min value of a column in the rows matching the expression, in SQL. `None` if no rows.
+        """
+        return self._aggregate_one("MIN", column, exp)
+
+    def max(self, column: str, exp: Exp = None) -> Any:
+        """
+        Get the max value of a column in the rows matching the expression, in SQL. `None` if no rows.
+        """
+        return self._aggregate_one("MAX", column, exp)
+
+    def group_by(self, columns: Union[str, List[str]], exp: Exp = None) -> GroupBy:
+        """
+        Group the rows matching the expression by column(s), then aggregate them by `.agg()`.
+
+        :param columns: The column(s) to group by.
+        :type columns: str | List[str]
+        :param exp: The query expression, default is all rows.
+        :type exp: Exp
+
+        :return: A `GroupBy` object.
+        :rtype: GroupBy
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            rows = table.group_by('age', table['score'] > 60).agg(n=('count', '*'), best=('max', 'score'))
+            rows[0]     # {'age': 18, 'n': 3, 'best': 99}
+
+        """
+        return GroupBy(self, columns, exp)
+
+    def _aggregation(self, func: str, column: str) -> str:
+        """
+        [Helper] Check and generate an aggregation, E.g., `('sum', 'score')` -> `'SUM(score)'`.
+        """
+        func = func.upper()
+        if func not in ("COUNT", "SUM", "AVG", "MIN", "MAX"):
+            raise NotSupportedError(f"Aggregation `{func}` not supported.")
+
+        if not (column == "*" and func == "COUNT") and column not in self.columns:
+            raise NotExistsError(f"Column `{column}` not exists.")
+
+        return f"{func}({column})"
+
+    def _aggregate_one(self, func: str, column: str, exp: Exp = None) -> Any:
+        """
+        [Helper] Aggregate a column of the rows matching the expression.
+        If the expression is split (see `Exp.split()`), the parts are aggregated one by one and combined, they match disjoint rows.
+        """
+        if exp is None:
+            exp = Exp(1, "=", 1)
+        exp.table = exp.table or self
+
+        parts = exp.split()
+        if len(parts) == 1:
+            return self._aggregate(self._aggregation(func, column), exp)[0][0]
+
+        if func == "AVG":
+            n = self._aggregate_one("COUNT", column, exp)
+            return self._aggregate_one("SUM", column, exp) / n if n else None
+
+        values = [self._aggregate(self._aggregation(func, column), part)[0][0] for part in parts]
+        values = [value for value in values if value is not None]
+        if not values:
+            return 0 if func == "COUNT" else None
+
+        return {"COUNT": sum, "SUM": sum, "MIN": min, "MAX": max}[func](values)
+
+    def _aggregate(self, aggregations: str, exp: Exp = None, group_by: str = "") -> list:
+        """
+        [Helper] Execute an aggregation command, return the fetched rows.
+        """
+        if exp is None:
+            exp = Exp(1, "=", 1)
+        exp.table = exp.table or self
+
+        # can't be split, E.g., groups would be spread over the parts
+        exp.check_size()
+
+        condition, paras = exp.formula()
+
+        cmd = self.db.compile(
+            ("aggregate", self.table_name, aggregations, condition, group_by),
+            lambda: self.driver.APIs.gensql.aggregate(self.table_name, aggregations, condition, group_by),
+        )
+
+        return self.db._read(self.table_name, cmd, paras)
+
+    def stream(self, exp: Exp = None, selection: str = "*", chunk: int = 1000):
+        """
+        Iterate through the selected rows, fetching them in chunks.
+        With `readers` (see `DataBase`), only a few chunks are held in memory at the same time, whatever the size of the result is.
+        Without them (or when all the stream connections are busy), the whole result is fetched at once, and handed over in chunks.
+
+        :param exp: The query expression.
+        :type exp: Exp
+        :param selection: The columns to select, default is '*'(all columns).
+        :type selection: str
+        :param chunk: The number of rows to fetch each time.
+        :type chunk: int
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            for row in table.stream(table['age'] > 18, chunk=5000):
+                print(row['name'])
+
+        .. note::
+           With `readers`, a stream connection is kept busy until the iteration is over (or the iterator is closed), so iterate it to the end, or close it.
+        """
+        if exp is None:
+            exp = Exp(1, "=", 1)
+
+        return iter(QueryResult(self, exp, selection, batch_size=chunk))
+
+    def _selection_keys(self, selection: str) -> list:
+        """
+        [Helper] Get the column names of a selection.
+        """
+        if selection == "*":
+            return self.columns
+        else:
+            return list(map(lambda x: x.strip(), selection.split(",")))
 
     def newColumn(
         self, name: str, type_: Any, force=False, primaryKey=False, autoIncrement=False
@@ -259,18 +643,21 @@ class Table:
             )
             self.db.do(cmd)
             self.isEmpty = False
+            self.columns.append(name)
+            self.columnsType[name] = type_
         else:
             cmd = self.driver.APIs.gensql.add_column(self.table_name, name, type_)
             self.db.do(cmd)
 
+            # known before `setPrimaryKey()`, which rebuilds the table with all the columns
+            self.columns.append(name)
+            self.columnsType[name] = type_
+
             if primaryKey:
                 self.setPrimaryKey(name, type_)
 
-        self.columns.append(name)
-        self.columnsType[name] = type_
-
     def struct(
-        self, columns: dict, skipError=True, primaryKey: str = None, autoIncrement=False, force=True
+        self, columns: dict, skipError=True, primaryKey: str = None, autoIncrement=False, force=True, indexes: list = None
     ) -> None:
         """
         Set the structure of the table.
@@ -281,6 +668,8 @@ class Table:
         :type skipError: bool
         :param primaryKey: The primary key of the table.
         :type primaryKey: str
+        :param indexes: The indexes of the table. Each is the column(s), or a dict of the arguments of `createIndex()`.
+        :type indexes: list
 
         Example Usage:
 
@@ -292,11 +681,45 @@ class Table:
                 'name': str
             }, primaryKey='id')
 
+            # in a template
+            db.setTemplate({'id': int, 'city': str, 'age': int}, primaryKey='id', indexes=[['city', 'age'], {'columns': 'age', 'unique': False}])
+
+        How It Works:
+            - Create the table with all the columns by one statement, if the table is empty.
+            - Otherwise, add the missing columns one by one (see `newColumn()`).
         """
 
         # Warning: `force` will be removed in next big version
         skipError = skipError and force
 
+        if self.isEmpty and columns:
+            # a new table: create it with all the columns at once
+            parsed = [(name, self.driver.TypeParser.parse(type_)) for name, type_ in columns.items()]
+            cmd = self.driver.APIs.gensql.create_table(
+                self.table_name,
+                parsed,
+                primaryKey=primaryKey if primaryKey in columns else None,
+                autoIncrement=autoIncrement,
+            )
+            self.db.do(cmd)
+            self.isEmpty = False
+
+            for name, type_ in parsed:
+                self.columns.append(name)
+                self.columnsType[name] = type_
+        else:
+            self._struct_columns(columns, skipError, primaryKey, autoIncrement)
+
+        for index in indexes or []:
+            if isinstance(index, dict):
+                self.createIndex(**index)
+            else:
+                self.createIndex(index)
+
+    def _struct_columns(self, columns: dict, skipError: bool, primaryKey: str, autoIncrement: bool) -> None:
+        """
+        [Helper] Add the missing columns of `struct()` one by one.
+        """
         for name, type_ in columns.items():
             type_origin = type_
             type_ = self.driver.TypeParser.parse(type_)
@@ -319,20 +742,69 @@ class Table:
                     autoIncrement=autoIncrement,
                 )
 
-    def delColumn(self, name: str) -> None:
+    def delColumn(self, name: str, chunk_size: int = 10000, progress: Callable[[int, int], None] = None) -> None:
+        """
+        Delete a column from the table.
+
+        :param name: The name of the column.
+        :type name: str
+        :param chunk_size: [online rebuild] The number of rows copied by each command.
+        :type chunk_size: int
+        :param progress: [online rebuild] Called with `(copied rows, total rows)` after each chunk.
+        :type progress: Callable[[int, int], None]
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            table.delColumn('age', progress=lambda copied, total: print(f"{copied}/{total}"))
+
+        How It Works:
+            - If the driver supports online rebuild (E.g., SQLite), the table is rebuilt without the column, see `Rebuild`.
+              Writers keep running during the copy, indexes on the column are dropped, the other constraints are kept.
+            - Otherwise (or if the column is used by a constraint, E.g., a `CHECK`), `ALTER TABLE ... DROP COLUMN`.
+        """
         if name not in self.columns:
             # column not exist
             raise NotExistsError(f"Column `{name}` not exist!")
         elif len(self.columns) == 1:
             # the last column, delete the table instead
             self.db.deleteTable(self.table_name)
-        else:
-            # delete the column
-            self.columns.remove(name)
-            cmd = self.driver.APIs.gensql.drop_column(name)
-            self.db.do(cmd)
-
-    def setPrimaryKey(self, keyname: str, keytype: str) -> None:
+            return
+
+        keys = []
+        if self.driver.online_rebuild:
+            cursor = self.db.do(self.driver.APIs.gensql.get_primary_key(self.table_name), readonly=True)
+            keys = [row[0] for row in cursor.fetchall()]
+
+        rebuilt = False
+        if self.driver.online_rebuild and len(keys) <= 1:
+            dropped = {index for index, info in self.indexes().items() if name in info["columns"]}
+            try:
+                Rebuild(
+                    self,
+                    [(col, self.columnsType[col]) for col in self.columns if col != name],
+                    primaryKey=keys[0] if keys and keys[0] != name else None,
+                    chunk_size=chunk_size,
+                    progress=progress,
+                    indexes=lambda index: index not in dropped,
+                ).run()
+                rebuilt = True
+            except NotSupportedError:
+                # the column is used by a constraint, leave it to the database
+                pass
+
+        if not rebuilt:
+            # composite primary key, constraints on the column, or no online rebuild
+            self.db.do(self.driver.APIs.gensql.drop_column(self.table_name, name))
+
+        self.columns.remove(name)
+        del self.columnsType[name]
+
+    def setPrimaryKey(
+        self, keyname: str, keytype: str, chunk_size: int = 10000, progress: Callable[[int, int], None] = None
+    ) -> None:
         """
         Set a column as the primary key of the table.
 
@@ -340,18 +812,170 @@ class Table:
         :type keyname: str
         :param keytype: The type of the column, been parsed by `TypeParser`.
         :type keytype: str
+        :param chunk_size: [online rebuild] The number of rows copied by each command.
+        :type chunk_size: int
+        :param progress: [online rebuild] Called with `(copied rows, total rows)` after each chunk.
+        :type progress: Callable[[int, int], None]
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            table.setPrimaryKey('id', 'INTEGER')
+
+        How It Works:
+            - If the driver supports online rebuild (E.g., SQLite), the table is rebuilt with the new primary key, see `Rebuild`.
+              Writers keep running during the copy. Raise `ConfilictError` if the column has duplicated values.
+            - Otherwise, by the driver's `set_primary_key()` (E.g., `ALTER TABLE` for MySQL).
+        """
+        if keyname not in self.columns:
+            raise NotExistsError(f"Column `{keyname}` not exists.")
+
+        if self.driver.online_rebuild:
+            Rebuild(
+                self,
+                [(col, keytype if col == keyname else self.columnsType[col]) for col in self.columns],
+                primaryKey=keyname,
+                chunk_size=chunk_size,
+                progress=progress,
+            ).run()
+        else:
+            cmd = self.driver.APIs.gensql.set_primary_key(self, keyname, keytype)
+            self.db.do(cmd)
+
+        self.columnsType[keyname] = keytype
+
+    def createIndex(
+        self,
+        columns: Union[str, List[str]],
+        unique: bool = False,
+        where: Union[Exp, str] = None,
+        name: str = None,
+        include: Union[str, List[str]] = None,
+    ) -> str:
+        """
+        Create an index on the table (if it does not exist).
+
+        :param columns: The column(s) of the index, in order.
+        :type columns: str | List[str]
+        :param unique: Whether the values (of all the columns) must be unique.
+        :type unique: bool
+        :param where: Only index the rows matching it (partial index). Values are inlined into the SQL. Not supported by MySQL.
+        :type where: Exp | str
+        :param name: The name of the index, default is `idx_<table>_<columns>`.
+        :type name: str
+        :param include: Extra column(s) stored in the index, so queries only reading them don't touch the table (covering index).
+        :type include: str | List[str]
+
+        :return: The name of the index.
+        :rtype: str
 
         Example Usage:
 
         .. code-block:: python
 
             table = db['test']
-            table.setPrimaryKey('id')
+            table.createIndex('name')
+            table.createIndex(['city', 'age'], include='score')            # composite & covering
+            table.createIndex('email', unique=True, where=table['deleted'] == 0)   # partial
 
+        .. note::
+           Neither SQLite nor MySQL has `INCLUDE`, so the `include` columns are appended to the key columns, which covers the same queries.
+           That would change what a unique index checks, so `include` with `unique` raises `NotSupportedError`.
         """
-        cmd = self.driver.APIs.gensql.set_primary_key(self, keyname, keytype)
+        if unique and include:
+            raise NotSupportedError("`include` can't be used with `unique`, the included columns would be part of the unique key.")
+
+        columns = self._column_list(columns)
+        keys = columns + [col for col in self._column_list(include or []) if col not in columns]
+
+        if name is None:
+            name = f"idx_{self.table_name}_{'_'.join(columns)}"
+
+        if isinstance(where, Exp):
+            where = self._inline(where)
+
+        cmd = self.driver.APIs.gensql.create_index(
+            name, self.table_name, ", ".join(keys), unique=unique, where=where or ""
+        )
         self.db.do(cmd)
 
+        return name
+
+    def dropIndex(self, name: str) -> None:
+        """
+        Drop an index of the table.
+
+        :param name: The name of the index.
+        :type name: str
+        """
+        if name not in self.indexes():
+            raise NotExistsError(f"Index `{name}` not exists.")
+
+        self.db.do(self.driver.APIs.gensql.drop_index(name, self.table_name))
+
+    def indexes(self) -> dict:
+        """
+        Get all the indexes of the table, which can be dropped by `dropIndex()`.
+        The indexes made by the database for the primary key / `UNIQUE` constraints (E.g., `sqlite_autoindex_*`) are not included.
+
+        :return: A mapping from index name to `{'columns': [...], 'unique': bool, 'partial': bool}`.
+        :rtype: dict
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table.indexes()     # {'idx_test_name': {'columns': ['name'], 'unique': False, 'partial': False}}
+
+        """
+        res = {}
+        for index, unique, partial, column in self.db.do(
+            self.driver.APIs.gensql.get_indexes(self.table_name), readonly=True
+        ).fetchall():
+            info = res.setdefault(index, {"columns": [], "unique": bool(unique), "partial": bool(partial)})
+            info["columns"].append(column)
+
+        return res
+
+    def _column_list(self, columns: Union[str, List[str]]) -> List[str]:
+        """
+        [Helper] Check the column(s) and return them as a list, E.g., `'a, b'` -> `['a', 'b']`.
+        """
+        if isinstance(columns, str):
+            columns = columns.split(",")
+        columns = [col.strip() for col in columns]
+
+        for col in columns:
+            if col not in self.columns:
+                raise NotExistsError(f"Column `{col}` not exists.")
+
+        return columns
+
+    @staticmethod
+    def _inline(exp: Exp) -> str:
+        """
+        [Helper] Generate the formula of the expression with the values inlined, for DDL which can't take parameters.
+        """
+        formula, paras = exp.formula()
+        parts = formula.split("___!!!PAYLOAD!!!___")
+
+        res = [parts[0]]
+        for value, part in zip(paras, parts[1:]):
+            if value is None:
+                value = "NULL"
+            elif isinstance(value, bool):
+                value = str(int(value))
+            elif isinstance(value, (int, float)):
+                value = repr(value)
+            else:
+                value = "'" + str(value).replace("'", "''") + "'"
+            res.append(value)
+            res.append(part)
+
+        return "".join(res)
+
     def insert(self, __auto=False, **kwargs) -> None:
         """
         Insert a row into the table.
@@ -367,6 +991,193 @@ class Table:
             table = db['test']
             table.insert(id=1, name='Bernie', age=15, __auto=True)
 
+        """
+        cmd, values = self._insert_cmd(kwargs, __auto)
+        self.db.do(cmd, paras=[values], table=self.table_name)
+
+    def insert_async(self, __auto=False, **kwargs) -> Future:
+        """
+        Insert a row into the table, without waiting for it. Same arguments as `insert()`.
+
+        :return: A future, which will be resolved after the row is inserted.
+        :rtype: concurrent.futures.Future
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            for i in range(10000):
+                f = table.insert_async(id=i, name='Bernie')
+            f.result()  # rows are inserted in order, so all of them are done
+
+        """
+        cmd, values = self._insert_cmd(kwargs, __auto)
+        return self.db.do_many_async(cmd, paras=[values], table=self.table_name)[0]
+
+    def insert_many(self, rows, columns: list = None, batch_size: int = 1000, **kwargs) -> int:
+        """
+        Insert many rows into the table.
+
+        :param rows: The rows to insert. Each row is a `dict`, or a `tuple` in the order of `columns`.
+        :type rows: Iterable[dict | tuple]
+        :param columns: The columns to insert. Default is the keys of the first row (dict), or all the columns of the table (tuple).
+        :type columns: list
+        :param batch_size: The number of rows in each batch. Each batch is inserted in one transaction.
+        :type batch_size: int
+        :param \_\_auto: Whether to update the row if it already exists (same as `insert()`).
+        :type \_\_auto: bool
+
+        :return: The number of rows inserted.
+        :rtype: int
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            table.insert_many([{'id': 1, 'name': 'Bernie'}, {'id': 2, 'name': 'Huang'}])
+            table.insert_many([(1, 'Bernie'), (2, 'Huang')], columns=['id', 'name'], __auto=True)
+            table.insert_many(read_csv(...), batch_size=5000)   # any iterable works
+
+        How It Works:
+            - compile the INSERT statement once.
+            - send each batch to the `CommandQueue` as a single `executemany()` command (MySQL's connector turns it into a multi-row `VALUES`).
+            - the next batches are prepared while the previous ones are running, and at most 2 batches are waiting at the same time.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return 0
+
+        if columns is None:
+            columns = list(first.keys()) if isinstance(first, dict) else self.columns
+        columns = list(columns)
+
+        cmd, _ = self._insert_cmd(
+            {key: None for key in columns}, kwargs.get("__auto", False)
+        )
+
+        def to_tuple(row):
+            return tuple(row[key] for key in columns) if isinstance(row, dict) else tuple(row)
+
+        count = 0
+        pending = []
+        batch = [to_tuple(first)]
+
+        for row in rows:
+            if len(batch) >= batch_size:
+                pending.append(self.db.executemany_async(cmd, batch, table=self.table_name))
+                count += len(batch)
+                batch = []
+
+                # don't let the batches pile up in the queue
+                if len(pending) > 2:
+                    pending.pop(0).result()
+
+            batch.append(to_tuple(row))
+
+        pending.append(self.db.executemany_async(cmd, batch, table=self.table_name))
+        count += len(batch)
+
+        for f in pending:
+            f.result()
+
+        return count
+
+    def update_many(self, rows: list, key: str = "id") -> int:
+        """
+        Update many rows by their keys, each row can have different values.
+
+        :param rows: The rows to update, each is a dict with the key and the columns to set.
+        :type rows: List[dict]
+        :param key: The column to find the rows, usually the primary key.
+        :type key: str
+
+        :return: The number of rows affected.
+        :rtype: int
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            table.update_many([{'id': 1, 'score': 90}, {'id': 2, 'score': 85}], key='id')
+
+        How It Works:
+            - rows with the same columns share one `UPDATE ... SET ... WHERE key = ?` statement, executed by `executemany()`.
+            - all the statements are sent as one command, so either all the rows are updated or none of them (E.g., a constraint fails).
+            - rows with only the key have nothing to set, they are skipped.
+        """
+        if key not in self.columns:
+            raise NotExistsError(f"Column `{key}` not exists.")
+
+        groups = {}
+        for row in rows:
+            if key not in row:
+                raise NotExistsError(f"Key `{key}` not exists in row {row}.")
+            columns = tuple(col for col in row if col != key)
+            if not columns:
+                # nothing to set
+                continue
+            groups.setdefault(columns, []).append(tuple(row[col] for col in columns) + (row[key],))
+
+        commands = []
+        for columns, paras in groups.items():
+            for col in columns:
+                if col not in self.columns:
+                    raise NotExistsError(f"Column `{col}` not exists.")
+
+            cmd = self.db.compile(
+                ("update_many", self.table_name, columns, key),
+                lambda: self.driver.APIs.gensql.update(
+                    self.table_name,
+                    ", ".join(f"{col} = ___!!!PAYLOAD!!!___" for col in columns),
+                    f"{key} = ___!!!PAYLOAD!!!___",
+                ),
+            )
+            commands.append((cmd, paras))
+
+        if not commands:
+            return 0
+
+        return self.db.executemany_atomic_async(commands, table=self.table_name).result()
+
+    def delete_many(self, keys: list, key: str = "id") -> int:
+        """
+        Delete many rows by their keys.
+
+        :param keys: The keys of the rows to delete.
+        :type keys: list
+        :param key: The column to find the rows, usually the primary key.
+        :type key: str
+
+        :return: The number of rows affected.
+        :rtype: int
+
+        Example Usage:
+
+        .. code-block:: python
+
+            table = db['test']
+            table.delete_many([1, 2, 3], key='id')
+
+        How It Works:
+            - one `DELETE ... WHERE key = ?` command, executed by `executemany()` in one transaction.
+        """
+        if key not in self.columns:
+            raise NotExistsError(f"Column `{key}` not exists.")
+
+        cmd = self.db.compile(
+            ("delete_many", self.table_name, key),
+            lambda: self.driver.APIs.gensql.delete(self.table_name, f"{key} = ___!!!PAYLOAD!!!___"),
+        )
+
+        return self.db.executemany_async(cmd, [(k,) for k in keys], table=self.table_name).result()
+
+    def _insert_cmd(self, kwargs: dict, __auto=False) -> tuple:
+        """
+        [Helper] Generate the INSERT command for `insert()`, return `(cmd, values)`.
         """
         # get keys and clean them
         keys = list(kwargs.keys())
@@ -374,18 +1185,21 @@ class Table:
             __auto = kwargs["__auto"]
             keys.remove("__auto")
 
-        columns = ", ".join(keys)
-        values = ", ".join([self.driver.payload for _ in range(len(keys))])
+        def build():
+            columns = ", ".join(keys)
+            values = ", ".join([self.driver.payload for _ in range(len(keys))])
 
-        # Determine the SQL command based on the value of `__auto`
-        if __auto:
-            cmd = self.driver.APIs.gensql.insert_or_update(
-                self.table_name, columns, values
-            )
-        else:
-            cmd = self.driver.APIs.gensql.insert(self.table_name, columns, values)
+            # Determine the SQL command based on the value of `__auto`
+            if __auto:
+                return self.driver.APIs.gensql.insert_or_update(
+                    self.table_name, columns, values
+                )
+            return self.driver.APIs.gensql.insert(self.table_name, columns, values)
+
+        key = ("insert_or_update" if __auto else "insert", self.table_name, tuple(keys))
+        cmd = self.db.compile(key, build)
 
-        self.db.do(cmd, paras=[tuple(kwargs[k] for k in keys)])
+        return cmd, tuple(kwargs[k] for k in keys)
 
     def update(self, exp: Exp, data: dict={}, **kwargs) -> None:
         """
@@ -401,7 +1215,7 @@ class Table:
 
         :param exp: The query expression.
         :type exp: Exp
-        :param data: The data to update.
+        :param data: The data to update. A value can also be an `Exp` computed from the columns, which is evaluated by the database.
         :type data: dict
 
         Example Usage:
@@ -412,19 +1226,49 @@ class Table:
             table.update(table['id'] == 1, name='Bernie', age=15)
             # OR
             (table['id'] == 1).update({"name": "Bernie", "age": 15})    # recommended
+
+            # SET hits = (hits + ?), one statement without reading the row
+            (table['id'] == 1).update({"hits": table['hits'] + 1})
             
         """
         
         if not data:
             data = kwargs
-        
-        columns = ", ".join([f"{key} = {self.driver.payload}" for key in data.keys()])
-        values = tuple(data.values())
 
-        condition, paras = exp.formula()
+        cmds, paras = self._update_cmds(exp, data)
+        self.db.do(*cmds, paras=paras, table=self.table_name)
+
+    def _update_cmds(self, exp: Exp, data: dict) -> tuple:
+        """
+        [Helper] Generate the UPDATE command(s) for `update()`, return `(cmds, paras)`.
+        There are more than one commands only if the condition is split (see `Exp.split()`).
+        """
+        exp.table = exp.table or self
+
+        # `col = ?`, or `col = (formula)` for an Exp
+        sets, values = [], []
+        for key, value in data.items():
+            if isinstance(value, Exp):
+                formula, para = value.formula()
+                sets.append((key, formula))
+                values.extend(para)
+            else:
+                sets.append((key, "___!!!PAYLOAD!!!___"))
+                values.append(value)
+        sets, values = tuple(sets), tuple(values)
 
-        cmd = self.driver.APIs.gensql.update(self.table_name, columns, condition)
-        self.db.do(cmd, paras=[values + paras])
+        cmds, paras = [], []
+        for part in exp.split(len(values)):
+            condition, para = part.formula()
+
+            def build():
+                columns = ", ".join([f"{key} = {formula}" for key, formula in sets])
+                return self.driver.APIs.gensql.update(self.table_name, columns, condition)
+
+            cmds.append(self.db.compile(("update", self.table_name, sets, condition), build))
+            paras.append(values + para)
+
+        return cmds, paras
 
 
 class QueryResult:
@@ -438,65 +1282,239 @@ class QueryResult:
 
         res = table.select(exp)
         for row in res:
-            print(row)
+            if row['name'] == 'Bernie':
+                break   # the rest of the rows are not fetched (with `readers`)
 
+    .. note::
+       A lazy result queries again every time it's iterated (until `len()`, indexing or `data` fetched all the rows).
+       Without `readers` (see `DataBase`), or if all the stream connections are busy, the whole query is executed at once, and the rows are handed over in batches.
     """
 
-    class QueryResultRow:
+    QueryResultRow = QueryResultRow
+
+    def __init__(self, table: Table, exp: Exp, selection: str = "*", values: list = None, batch_size: int = None, **clauses):
+        """
+        :param values: The fetched rows. If not given, the query will be executed here.
+        :type values: list
+        :param batch_size: If set, the query is not executed until the result is used, and the rows are streamed in batches of this size when iterating.
+        :type batch_size: int
+        :param \*\*clauses: `order_by` (in SQL), `limit` and `offset` of the query, see `Exp.query_cmd()`.
+
+        How It Works:
+            - rows are kept as fetched (tuples), and only wrapped into `QueryResultRow` when they are iterated / indexed.
+            - with `batch_size`, iterating doesn't hold the whole result in memory. But `len()`, indexing and `data` will fetch all the rows.
+        """
+        self.table = table
+        self.exp = exp
+        self.selection = selection
+        self.keys = table._selection_keys(selection)
+        self.index = {key: i for i, key in enumerate(self.keys)}  # shared by all rows
+        self.batch_size = batch_size
+        self.clauses = clauses
+
+        if values is None and batch_size is None:
+            values = exp.query(table, selection, **clauses)
+        self.values = values
+
+    def _fetch(self) -> list:
+        """
+        [Helper] Fetch all the rows, if not fetched yet.
         """
-        [Helper Class]
-        Representing a single row of the query result.
-        You can use QueryResult[i] to get it, and use it by `row.column_name`.
+        if self.values is None:
+            self.values = self.exp.query(self.table, self.selection, **self.clauses)
+
+        return self.values
+
+    def _stream(self, size: int):
+        """
+        [Helper] Execute the query again, yield the rows in batches of `size`.
+        """
+        for cmd, paras in self.exp.query_cmds(self.table, self.selection, **self.clauses):
+            c = self.table.db.do(cmd, paras=[paras], readonly=True, chunk=size)
+            try:
+                while True:
+                    rows = c.fetchmany(size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                c.close()
+
+    def iter_batches(self, size: int = 1000):
+        """
+        Iterate through the result in batches.
+
+        :param size: The number of rows in each batch.
+        :type size: int
+
+        :return: A generator of batches, each batch is a list of `QueryResultRow`.
 
         Example Usage:
 
         .. code-block:: python
 
-            res = table.select(exp)
-            row = res[0]
-            print(row.id)
+            res = table.select(exp, batch_size=5000)
+            for batch in res.iter_batches(5000):
+                etl(batch)
 
         """
+        index = self.index
 
-        def __init__(self, data: dict):
-            self.data = data
+        for rows in self._batches(size):
+            yield [QueryResultRow(row, index) for row in rows]
 
-        def __getitem__(self, __name: str) -> Any:
-            """
-            The main method of this class, used to get the value of a column.
+    def _batches(self, size: int):
+        """
+        [Helper] Yield the fetched rows (tuples) in batches of `size`, streaming them if not fetched yet.
+        """
+        if self.values is None and self.table.db.result_cache is None:
+            yield from self._stream(size)
+        else:
+            # with the result cache, repeated queries are served by it (see `DataBase.setResultCache()`)
+            values = self._fetch()
+            for i in range(0, len(values), size):
+                yield values[i:i + size]
+
+    def to_columns(self, size: int = 10000) -> dict:
+        """
+        Convert the result into columns, without building any row object.
 
-            :param __name: The name of the column.
-            :type __name: str
+        Numeric columns (judged by `Table.columnsType` and the driver's `TypeParser.dtype()`) are NumPy arrays, others are lists.
+        `NULL`s in integer / boolean columns turn the column into `float64` with `nan`.
+        A column holding values of other types (E.g., text in an `INTEGER` column of SQLite) is a list as well.
 
-            :return: The value of the column.
-            """
-            data = object.__getattribute__(self, "data")
-            if __name == "data":
-                return data
+        :param size: The number of rows to fetch & convert each time.
+        :type size: int
+
+        :return: A mapping from column name to its values.
+        :rtype: dict
+
+        Example Usage:
+
+        .. code-block:: python
+
+            cols = table.select(exp).to_columns()
+            cols['score'].mean()
+
+        .. note::
+           NumPy is optional. Without it, all the columns are lists.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+        columnsType = self.table.columnsType
+        dtypes = {
+            key: self.table.driver.TypeParser.dtype(columnsType[key])
+            if np is not None and key in columnsType
+            else None
+            for key in self.keys
+        }
+        chunks = {key: [] for key in self.keys}
+
+        for rows in self._batches(size):
+            for key, col in zip(self.keys, zip(*rows)):
+                dtype = dtypes[key]
+                if dtype is not None:
+                    if dtype != "float64" and None in col:
+                        dtype = "float64"   # NULL -> nan
+                    try:
+                        col = np.array(col, dtype=dtype)
+                    except (TypeError, ValueError, OverflowError):
+                        # not numeric after all, turn the column into a list (nan -> NULL)
+                        dtypes[key] = None
+                        chunks[key] = [[None if v != v else v for v in c.tolist()] for c in chunks[key]]
+                chunks[key].append(col)
+
+        columns = {}
+        for key in self.keys:
+            if dtypes[key] is None:
+                columns[key] = [v for col in chunks[key] for v in col]
+            elif chunks[key]:
+                columns[key] = np.concatenate(chunks[key])
             else:
-                return data[__name]
-
-        def __iter__(self):
-            """
-            Make it possible to iterate through.
-            It will work as a `dict`.
-            """
-            return iter(self.data)
-
-    def __init__(self, table: Table, exp: Exp, selection: str = "*"):
-        values = exp.query(table, selection)
-        keys = (
-            table.columns
-            if selection == "*"
-            else list(map(lambda x: x.strip(), selection.split(",")))
-        )
-        self.data = [dict(zip(keys, row)) for row in values]
+                columns[key] = np.array([], dtype=dtypes[key])
+
+        return columns
+
+    @property
+    def data(self) -> list:
+        """
+        All the rows, as a list of `QueryResultRow`.
+        """
+        index = self.index
+        return [QueryResultRow(row, index) for row in self._fetch()]
+
+    def as_dicts(self) -> List[dict]:
+        """
+        All the rows, as a list of plain `dict` (E.g., for `json.dumps()`).
+        """
+        keys = self.keys
+        return [dict(zip(keys, row)) for row in self._fetch()]
 
-    def __getitem__(self, index: int) -> QueryResultRow:
-        return self.QueryResultRow(self.data[index])
+    def __getitem__(self, index: Union[int, slice]) -> Union[QueryResultRow, List[QueryResultRow]]:
+        if isinstance(index, slice):
+            return [QueryResultRow(row, self.index) for row in self._fetch()[index]]
+
+        return QueryResultRow(self._fetch()[index], self.index)
 
     def __iter__(self):
-        return iter(self.data)
+        if self.values is None:
+            for rows in self.iter_batches(self.batch_size):
+                yield from rows
+        else:
+            index = self.index
+            for row in self.values:
+                yield QueryResultRow(row, index)
 
     def __len__(self):
-        return len(self.data)
+        return len(self._fetch())
+
+
+class GroupBy:
+    """
+    [Helper Class]
+    The rows of a table grouped by column(s), waiting to be aggregated. Can be got by `table.group_by()`.
+    """
+
+    def __init__(self, table: Table, columns: Union[str, List[str]], exp: Exp = None):
+        if isinstance(columns, str):
+            columns = columns.split(",")
+        columns = [col.strip() for col in columns]
+
+        for col in columns:
+            if col not in table.columns:
+                raise NotExistsError(f"Column `{col}` not exists.")
+
+        self.table = table
+        self.columns = columns
+        self.exp = exp
+
+    def agg(self, **aggregations) -> list:
+        """
+        Aggregate each group, in one SQL command.
+
+        :param \*\*aggregations: `alias=(function, column)`, function is one of `count`, `sum`, `avg`, `min`, `max`.
+
+        :return: One row for each group, with the grouped columns and the aliases.
+        :rtype: List[QueryResultRow]
+
+        Example Usage:
+
+        .. code-block:: python
+
+            rows = table.group_by(['city', 'age']).agg(n=('count', '*'), avg_score=('avg', 'score'))
+            for row in rows:
+                print(row['city'], row['age'], row['n'], row['avg_score'])
+
+        """
+        selection = list(self.columns)
+        for alias, (func, column) in aggregations.items():
+            selection.append(f"{self.table._aggregation(func, column)} AS {alias}")
+
+        group_by = ", ".join(self.columns)
+        rows = self.table._aggregate(", ".join(selection), self.exp, group_by)
+
+        index = {key: i for i, key in enumerate(self.columns + list(aggregations))}
+        return [QueryResultRow(row, index) for row in rows]
@@ -6,70 +6,430 @@ This is useful when you are working with multiple threads and want to execute co
 
 import queue
 import threading
+import time
 import sys
+from concurrent.futures import Future
 
 FETCHALL = -1
 
 
+class CQCommand:
+    """
+    A command in the `CommandQueue`.
+    Its `future` will be resolved with the fetched rows (or the raised exception) after the command is committed.
+
+    If `chunk` is set, the `future` will be resolved with a `CQStream` as soon as the command is executed, and the rows are handed over chunk by chunk.
+    A read-only stream runs on one of the stream connections (if there are `readers`, and one of them is free), so it can be consumed slowly and interleaved with other commands.
+    Otherwise it runs on the writer / a reader, which fetches all the rows at once and never waits for the consumer.
+
+    If `many` is set, `param` is a list of parameter tuples, and the query is executed once for each of them by `executemany()` (in the same transaction).
+    The `future` will be resolved with the number of rows affected.
+
+    If `script` is set, `query` is a list of `(query, param)` pairs, which are executed all or nothing (in a savepoint).
+    The `future` will be resolved with the rows fetched by the last one.
+    With both `script` and `many`, each `param` is a list of parameter tuples, and the `future` will be resolved with the total number of rows affected.
+    """
+
+    __slots__ = ("query", "param", "future", "chunk", "many", "script")
+
+    def __init__(self, query: str, param: tuple = (), chunk: int = 0, many: bool = False, script: bool = False):
+        self.query = query
+        self.param = param
+        self.future = Future()
+        self.chunk = chunk
+        self.many = many
+        self.script = script
+
+
+class CQStream:
+    """
+    A bounded handoff of row chunks, from the worker thread to the consumer.
+
+    The worker waits while `maxsize` chunks are not consumed, so at most `maxsize + 1` chunks are held in memory, whatever the size of the result is.
+    An empty chunk means the end of the result.
+    """
+
+    def __init__(self, maxsize: int = 2):
+        """
+        :param maxsize: The max number of chunks waiting to be consumed, `0` for no limit (the worker never waits).
+        :type maxsize: int
+        """
+        self.chunks = queue.Queue(maxsize)
+        self.closed = False
+        self.on_put = None  # called (by the worker) after each chunk is handed over, E.g., to wake up an event loop
+
+    def put(self, chunk) -> bool:
+        """
+        [Worker] Hand over a chunk (or an exception). Return False if the consumer has closed the stream.
+        """
+        while not self.closed:
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+            except queue.Full:
+                continue
+
+            if self.on_put is not None:
+                self.on_put()
+            return True
+
+        return False
+
+    def get(self) -> list:
+        """
+        [Consumer] Get the next chunk, raise the exception if the worker failed.
+        """
+        chunk = self.chunks.get()
+        if isinstance(chunk, Exception):
+            raise chunk
+
+        return chunk
+
+    def get_nowait(self) -> list:
+        """
+        [Consumer] Same as `get()`, but raise `queue.Empty` instead of waiting, if the next chunk is not ready.
+        """
+        chunk = self.chunks.get_nowait()
+        if isinstance(chunk, Exception):
+            raise chunk
+
+        return chunk
+
+    def close(self) -> None:
+        """
+        [Consumer] Stop receiving, so the worker can move on to the next command.
+        """
+        self.closed = True
+
+
 class CommandQueue:
-    def __init__(self, driver, db_name: str, **conn_ops):
+    def __init__(
+        self,
+        driver,
+        db_name: str,
+        group_commit: bool = False,
+        max_batch: int = 100,
+        max_linger: float = 0.0,
+        on_commit: callable = None,
+        readers: int = 0,
+        **conn_ops
+    ):
+        """
+        :param driver: The driver to connect with.
+        :param db_name: The name of the database.
+        :type db_name: str
+        :param group_commit: Run every waiting command in one transaction, and commit once for the whole batch.
+        :type group_commit: bool
+        :param max_batch: [group commit] The max number of commands to be covered by one commit.
+        :type max_batch: int
+        :param max_linger: [group commit] The max seconds to wait for more commands before committing a batch.
+        :type max_linger: float
+        :param on_commit: Called with the number of commands covered, after each commit.
+        :type on_commit: callable
+        :param readers: The number of extra reader connections. Read-only commands are executed on them in parallel, while all the other commands go to the (only) writer connection.
+                        The same number of stream connections are opened for read-only streams, which hold their connection until they are consumed.
+        :type readers: int
+        :param conn_ops: The parameters for `driver.connect()`.
+        """
         self.driver = driver
         self.conn_info = (db_name, conn_ops)
 
         self.queue = queue.Queue()
 
+        # group commit
+        self.max_batch = max(1, max_batch) if group_commit else 1
+        self.max_linger = max_linger
+        self.on_commit = on_commit
+        self.stats = {"commits": 0, "commands": 0, "last_batch": 0}
+
+        # parallel readers
+        self.readers = readers
+        self.read_queue = queue.Queue() if readers > 0 else self.queue
+        self.stream_queue = queue.Queue()
+        self.stream_slots = threading.Semaphore(readers)  # free stream connections
+
         # start the loop, starts to process the project now
         self.isRunning = True
+        self.threads = []
         self.loop()
 
-    def stop(self):
+    def stop(self, wait: bool = False):
+        """
+        Stop the worker threads, and close their connections.
+        Commands already in the queue will be processed first.
+
+        :param wait: Whether to wait until all the threads are over.
+        :type wait: bool
+        """
+        if not self.isRunning:
+            return
+
         self.isRunning = False
 
+        # wake up the sleeping threads
+        self.queue.put(None)
+        if self.readers > 0:
+            for _ in range(self.readers):
+                self.read_queue.put(None)
+                self.stream_queue.put(None)
+
+        if wait:
+            for t in self.threads:
+                t.join()
+
     def __del__(self):
         self.stop()
 
-    def put(self, command):
+    def put(self, command, readonly: bool = False):
         """
         Put a command into the queue.
 
         :param command: The command to put into the queue.
-        :type command: Any
+        :type command: CQCommand
+        :param readonly: Whether the command only reads the database, so it can be sent to a reader connection.
+        :type readonly: bool
+        """
+        if readonly and command.chunk > 0 and self.readers > 0 and self.stream_slots.acquire(blocking=False):
+            # a stream may be consumed slowly (or with other commands in between), so it holds a stream connection, never a reader
+            self.stream_queue.put(command)
+        elif readonly:
+            # streams too, if all the stream connections are busy: fetched at once, so they never wait for the consumer
+            self.read_queue.put(command)
+        else:
+            self.queue.put(command)
+
+    def _connect(self):
         """
-        self.queue.put(command)
+        [Helper] Start a new connection to the database.
+        """
+        db_name, conn_ops = self.conn_info
+        return self.driver.connect(db_name, **conn_ops)
+
+    @staticmethod
+    def _execute(cursor, command: CQCommand, lazy: bool = True):
+        """
+        [Helper] Execute a command with the real cursor, return the fetched rows (or the number of rows affected, for `many`).
+
+        For streaming commands, the future is resolved here with a `CQStream`, and this method returns after all the chunks are handed over (or the stream is closed).
+        If not `lazy` (the writer), all the chunks are handed over at once, so it never waits for the consumer.
+        """
+        if command.script:
+            # SAVEPOINT works both inside a transaction (group commit) and outside (starts one)
+            cursor.execute("SAVEPOINT ___cq_script")
+            try:
+                affected = 0
+                for query, param in command.query:
+                    if command.many:
+                        cursor.executemany(query, param)
+                        affected += cursor.rowcount
+                    else:
+                        cursor.execute(query, param)
+                rows = affected if command.many else cursor.fetchall()
+            except Exception:
+                cursor.execute("ROLLBACK TO SAVEPOINT ___cq_script")
+                cursor.execute("RELEASE SAVEPOINT ___cq_script")
+                raise
+            cursor.execute("RELEASE SAVEPOINT ___cq_script")
+            return rows
+
+        if command.many:
+            cursor.executemany(command.query, command.param)
+            return cursor.rowcount
+
+        cursor.execute(command.query, command.param)
+
+        if command.chunk <= 0:
+            return cursor.fetchall()
+
+        stream = CQStream() if lazy else CQStream(maxsize=0)
+        command.future.set_result(stream)
+
+        try:
+            while True:
+                rows = cursor.fetchmany(command.chunk)
+                if not stream.put(rows) or not rows:
+                    break
+        except Exception as e:
+            stream.put(e)
+
+        return stream
+
+    @staticmethod
+    def _in_transaction(conn) -> bool:
+        """
+        [Helper] Whether the connection has an open transaction. Assumed to be, if the driver can't tell.
+        """
+        return getattr(conn, "in_transaction", True)
+
+    def _get_batch(self) -> list:
+        """
+        [Helper] Block until a command arrives, then drain the waiting commands into a batch.
+
+        The batch is closed when it reaches `self.max_batch` commands, or when no more commands arrive within `self.max_linger` seconds.
+        """
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.max_linger
+
+        while len(batch) < self.max_batch and batch[-1] is not None:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
 
     def loop(self):
         """
         Loop through the queue and execute each command (in an new thread).
         When the queue is empty, the loop will wait for new commands.
+
+        In group commit mode, all commands of a batch are executed in one transaction, and the futures are resolved after the (only) commit.
+
+        If `readers` is set, the reader (and stream) threads will be started after the writer is ready.
         """
+        writer_ready = threading.Event()
 
         # start a new thread
         def loop_thread():
             # start a new conn
-            db_name, conn_ops = self.conn_info
-            conn = self.driver.connect(db_name, **conn_ops)
+            conn = self._connect()
             cursor = conn.cursor()
 
-            while self.isRunning:
+            if self.readers > 0:
+                # let readers run while the writer works (e.g. WAL for SQLite)
                 try:
-                    query, param, callback = self.queue.get()
+                    cmd = self.driver.APIs.gensql.enable_concurrent_read()
+                    if cmd:
+                        cursor.execute(cmd)
+                        cursor.fetchall()
+                        conn.commit()
+                except Exception as e:
+                    print(e, file=sys.stderr)
+
+            writer_ready.set()
+
+            while True:
+                batch = self._get_batch()
+                done = []
+                begin = 0   # where the open transaction began in `done`
+
+                for command in batch:
+                    if command is None:
+                        continue
+
+                    if not self._in_transaction(conn):
+                        begin = len(done)
+
+                    try:
+                        done.append((command, self._execute(cursor, command, lazy=False), None))
+                    except Exception as e:
+                        done.append((command, None, e))
+
+                        if begin < len(done) - 1 and not self._in_transaction(conn):
+                            # the error rolled back the whole transaction (E.g., `ON CONFLICT ROLLBACK`, I/O errors), with the commands before it
+                            done[begin:] = [(c, None, error or e) for c, _, error in done[begin:]]
 
-                    cursor.execute(query, param)
+                try:
                     conn.commit()
-                    result = cursor.fetchall()
+                except Exception as e:
+                    # nothing in this batch is saved, and must not be saved by the next commit
+                    try:
+                        conn.rollback()
+                    except Exception as e2:
+                        print(e2, file=sys.stderr)
+                    done = [(command, None, error or e) for command, _, error in done]
+
+                n = len(batch) - (batch[-1] is None)
+                if n > 0:
+                    # never let the hook kill the (only) writer thread
+                    try:
+                        self.stats["commits"] += 1
+                        self.stats["commands"] += n
+                        self.stats["last_batch"] = n
+                        if self.on_commit is not None:
+                            self.on_commit(n)
+                    except Exception as e:
+                        print(e, file=sys.stderr)
+
+                # results are visible to others only after the commit
+                for command, result, error in done:
+                    if command.future.done():
+                        continue    # streams are resolved earlier
+                    elif error is None:
+                        command.future.set_result(result)
+                    else:
+                        command.future.set_exception(error)
+
+                for _ in batch:
+                    self.queue.task_done()
+
+                if batch[-1] is None:
+                    break
+
+            cursor.close()
+            conn.close()
+
+        def reader_thread():
+            conn = self._connect()
+            cursor = conn.cursor()
+
+            while True:
+                command = self.read_queue.get()
+                if command is None:
+                    self.read_queue.task_done()
+                    break
 
-                    callback(result)
+                try:
+                    result = self._execute(cursor, command, lazy=False)
+                    conn.commit()  # end the read transaction, so the next read sees new data
+
+                    if not command.future.done():
+                        command.future.set_result(result)
                 except Exception as e:
-                    print(e, file=sys.stderr)
+                    if not command.future.done():
+                        command.future.set_exception(e)
+
+                self.read_queue.task_done()
 
-                conn.commit()
-                self.queue.task_done()
-            
             cursor.close()
             conn.close()
 
-        # Start a Daemon thread, which will be killed when the main thread is over.
-        threading.Thread(target=loop_thread, daemon=True).start()
+        def stream_thread():
+            conn = self._connect()
+
+            while True:
+                command = self.stream_queue.get()
+                if command is None:
+                    break
+
+                # a new cursor each time, closing it releases the rows left by a stream closed early
+                cursor = conn.cursor()
+                try:
+                    self._execute(cursor, command)
+                    cursor.close()
+                    conn.commit()  # end the read transaction, so the next stream sees new data
+                except Exception as e:
+                    if not command.future.done():
+                        command.future.set_exception(e)
+                finally:
+                    self.stream_slots.release()
+
+            conn.close()
+
+        # Start Daemon threads, which will be killed when the main thread is over.
+        self.threads.append(threading.Thread(target=loop_thread, daemon=True))
+        self.threads[0].start()
+
+        if self.readers > 0:
+            writer_ready.wait()
+            for _ in range(self.readers):
+                self.threads.append(threading.Thread(target=reader_thread, daemon=True))
+                self.threads[-1].start()
+                self.threads.append(threading.Thread(target=stream_thread, daemon=True))
+                self.threads[-1].start()
 
     def get_cursor(self):
         """
@@ -85,49 +445,167 @@ class CommandQueue:
 class CQFakeCursor:
     def __init__(self, cq):
         self.cq = cq
-        self.event = threading.Event()
+        self.result = []
+        self.pos = 0
+        self.stream = None
+        self.rowcount = -1  # rows affected by the last `executemany()`
+
+    def submit(self, query: str, param: tuple = (), readonly: bool = False, chunk: int = 0, many: bool = False, script: bool = False) -> Future:
+        """
+        Put a query into the queue, without waiting for it.
+
+        :param query: The query to execute.
+        :type query: str
+        :param param: The parameters for the query.
+        :type param: tuple
+        :param readonly: Whether the query only reads the database (E.g., `SELECT ...`).
+        :type readonly: bool
+        :param chunk: Stream the result in chunks of this size (see `execute()`).
+        :type chunk: int
+        :param many: Whether `param` is a list of parameter tuples (see `executemany()`).
+        :type many: bool
+        :param script: Whether `query` is a list of `(query, param)` pairs, to be executed all or nothing.
+        :type script: bool
+
+        :return: A future, which will be resolved with all the fetched rows (or a `CQStream` if `chunk` is set).
+        :rtype: concurrent.futures.Future
+
+        Example Usage:
+
+        .. code-block:: python
+
+            c = cq.get_cursor()
+            futures = [c.submit("INSERT INTO test (id) VALUES (?)", (i,)) for i in range(1000)]
+            futures[-1].result()    # commands are executed in order, so all of them are done
 
-    def execute(self, query: str, param: tuple) -> None:
+        .. note::
+           Read-only queries may run on reader connections (see `readers`), so they are not ordered with the writes.
         """
-        Execute a query.
+        command = CQCommand(query, param, chunk=chunk, many=many, script=script)
+        self.cq.put(command, readonly=readonly)
+
+        return command.future
+
+    execute_async = submit
+
+    def execute(self, query: str, param: tuple = (), readonly: bool = False, chunk: int = 0) -> None:
+        """
+        Execute a query, and wait until it's done.
 
         :param query: The query to execute.
         :type query: str
         :param param: The parameters for the query.
         :type param: tuple
+        :param readonly: Whether the query only reads the database (E.g., `SELECT ...`).
+        :type readonly: bool
+        :param chunk: Stream the result in chunks of this size, instead of fetching all of them at once.
+        :type chunk: int
+
+        .. note::
+           Rows are only streamed from the database for read-only queries with `readers`, on a dedicated connection.
+           Otherwise the writer fetches all of them at once (and hands them over in chunks), so it is never blocked by a slow consumer.
+        """
+        self.close()
+
+        res = self.submit(query, param, readonly=readonly, chunk=chunk).result()
+        if chunk > 0:
+            self.stream = res
+        else:
+            self.result = res
+
+        return None
+
+    def executemany(self, query: str, params: list) -> None:
         """
-        def callback(result):
-            self.result = result
-            self.event.set()
+        Execute a query once for each parameter tuple, in one transaction, and wait until it's done.
 
-        self.cq.put((query, param, callback))
-        self.event.wait()  # wait
+        :param query: The query to execute.
+        :type query: str
+        :param params: The parameters for each execution.
+        :type params: List[tuple]
+        """
+        self.close()
+        self.rowcount = self.submit(query, params, many=True).result()
 
         return None
 
+    def _fill(self, size: int = None) -> None:
+        """
+        [Helper] Pull chunks from the stream, until `size` rows are buffered or the stream is over.
+        """
+        while self.stream is not None and (size is None or len(self.result) - self.pos < size):
+            try:
+                rows = self.stream.get()
+            except Exception:
+                self.stream = None
+                raise
+
+            if not rows:
+                self.stream = None
+                break
+
+            # drop the consumed rows, so the buffer won't grow
+            self.result = self.result[self.pos:] + rows
+            self.pos = 0
+
     def fetchall(self):
         """
-        Fetch all results.
+        Fetch all (remaining) results.
 
         :return: The results.
         :rtype: list
         """
-        return self.result
+        self._fill()
+
+        rows = self.result[self.pos:] if self.pos else self.result
+        self.result, self.pos = [], 0
+
+        return rows
 
     def fetchone(self):
         """
-        Fetch one result.
+        Fetch the next result.
 
-        :return: The result.
+        :return: The result, or None if no more results.
         :rtype: Any
         """
-        return self.result[0]
+        rows = self.fetchmany(1)
+
+        return rows[0] if rows else None
 
-    def fetchmany(self, size: int):
+    def fetchmany(self, size: int = 1):
         """
-        Fetch a specific number of results.
+        Fetch the next `size` results.
 
         :param size: The number of results to fetch.
         :type size: int
         """
-        return self.result[:size]
+        self._fill(size)
+
+        rows = self.result[self.pos:self.pos + size]
+        self.pos += len(rows)
+
+        return rows
+
+    def close(self) -> None:
+        """
+        Close the stream (if any), so the worker thread can move on.
+        """
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+        self.result, self.pos = [], 0
+
+    def __iter__(self):
+        """
+        Iterate through the (remaining) results.
+        """
+        while True:
+            rows = self.fetchmany(1000)
+            if not rows:
+                return
+            yield from rows
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,104 @@
+"""
+Benchmark: request latency of concurrent coroutines, blocking `Table` vs `AsyncTable`.
+
+Two kinds of requests:
+  - lookup: one `SELECT` by primary key, almost all the time is spent in Python.
+  - scan: one `SELECT` scanning the whole table (`LIKE`), most of the time is spent in SQLite, outside the event loop.
+Latency is measured from the moment all requests are started.
+"loop lag" is the longest time the event loop was unable to run anything else (e.g. a 1ms ticker).
+"""
+import benchlib
+
+from MercurySQL import DataBase, AsyncDataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+
+import asyncio
+import time
+
+set_driver(Driver_SQLite)
+
+DB_FILE = 'bench_asyncio.db'
+ROWS = 100000
+REQUESTS = {'lookup': 1000, 'scan': 50}
+
+
+def prepare():
+    benchlib.fresh_db(DB_FILE)
+    db = DataBase(DB_FILE)
+    tb = db['test']
+    tb.struct({'id': int, 'name': str}, primaryKey='id')
+    tb.insert_many([(i, f"name{i}") for i in range(ROWS)], columns=['id', 'name'])
+    db.cq.stop(wait=True)
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    pick = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return f"{pick(0.5):.1f}", f"{pick(0.99):.1f}", f"{latencies[-1] * 1000:.1f}"
+
+
+def query(tb, kind, i):
+    if kind == 'lookup':
+        return tb['id'] == i * 7 % ROWS
+    return tb['name'].like(f"%{i}9%")
+
+
+async def measure(request, n):
+    start = time.perf_counter()
+    lag = 0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            t = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - t - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+
+    latencies = await asyncio.gather(*[request(i, start) for i in range(n)])
+    done = True
+    await tick
+
+    return (*percentiles(latencies), f"{lag * 1000:.1f}")
+
+
+async def run_blocking(tb, kind):
+    async def request(i, start):
+        list(tb.select(query(tb, kind, i)))     # blocks the event loop
+        return time.perf_counter() - start
+
+    return await measure(request, REQUESTS[kind])
+
+
+async def run_async(atb, kind):
+    async def request(i, start):
+        list(await atb.select(query(atb, kind, i)))
+        return time.perf_counter() - start
+
+    return await measure(request, REQUESTS[kind])
+
+
+if __name__ == '__main__':
+    prepare()
+
+    rows = []
+    for readers in (0, 4):
+        adb = AsyncDataBase(DB_FILE, cq_ops={'readers': readers})
+        tb = adb.db['test']
+        atb = adb['test']
+
+        for kind in REQUESTS:
+            rows.append((kind, "Table (blocking)", readers, *asyncio.run(run_blocking(tb, kind))))
+            rows.append((kind, "AsyncTable", readers, *asyncio.run(run_async(atb, kind))))
+
+        adb.db.cq.stop(wait=True)
+
+    benchlib.report(
+        f"Latency of concurrent requests (ms), {REQUESTS}",
+        rows,
+        ("request", "api", "readers", "p50", "p99", "max", "loop lag"),
+    )
+    benchlib.fresh_db(DB_FILE)
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+
+def set_path():
+    """
+    Set the path to the root directory of the project.
+    """
+    sys.path.insert(0, '../../')
+    sys.path.insert(0, './')
+
+
+def fresh_db(path):
+    """
+    Remove the database file (and its WAL/journal files), so every benchmark starts from scratch.
+    """
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def timeit(func, *args, **kwargs):
+    """
+    Run `func` once, return `(seconds, result)`.
+    """
+    start = time.perf_counter()
+    res = func(*args, **kwargs)
+    return time.perf_counter() - start, res
+
+
+def report(title, rows, headers):
+    """
+    Print the results as a simple table.
+    """
+    print(f"\n=== {title} ===")
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for r in rows:
+        print('  '.join(str(c).rjust(w) for c, w in zip(r, widths)))
+
+
+### Benchlib ###
+if __name__:
+    set_path()
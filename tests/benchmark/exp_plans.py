@@ -0,0 +1,27 @@
+"""
+Benchmark: compiling long `AND` chains, the first time (new shape) vs again with other values (cached plan).
+"""
+import benchlib
+
+from MercurySQL.gensql.exp import Exp, _plans
+
+LENGTHS = (10, 100, 1000, 10000)
+
+
+def chain(n, offset):
+    exp = Exp('c0') == offset
+    for i in range(1, n):
+        exp = exp & (Exp(f'c{i % 16}') == i + offset)
+    return exp
+
+
+if __name__ == '__main__':
+    results = []
+    for n in LENGTHS:
+        _plans.clear()
+        first, _ = benchlib.timeit(chain(n, 0).formula)
+        again, _ = benchlib.timeit(chain(n, 1).formula)
+        results.append((n, f"{first * 1000:.2f}", f"{again * 1000:.2f}"))
+
+    benchlib.report("formula of `(c0 == ?) & (c1 == ?) & ...`", results, ("terms", "new shape ms", "cached ms"))
+    print(_plans.stats())
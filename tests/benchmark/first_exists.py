@@ -0,0 +1,46 @@
+"""
+Benchmark: `first()` / `exists()` vs the old patterns `select(exp)[0]` / `len(select(exp)) > 0`.
+"""
+import benchlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers import sqlite
+
+DB = 'first_exists.db'
+ROWS = 100000
+GROUPS = 10     # every `group` matches ROWS / GROUPS rows
+LOOPS = 50
+
+
+def repeat(func):
+    for i in range(LOOPS):
+        func(i % GROUPS)
+
+
+if __name__ == '__main__':
+    set_driver(sqlite)
+    benchlib.fresh_db(DB)
+
+    db = DataBase(DB)
+    tb = db.createTable('users')
+    tb.newColumn('id', int, primaryKey=True)
+    tb.newColumn('grp', int)
+    tb.newColumn('name', str)
+    tb.insert_many([(i, i % GROUPS, f"user{i}") for i in range(ROWS)], columns=['id', 'grp', 'name'])
+
+    cases = (
+        ("select(exp)[0]", lambda g: tb.select(tb['grp'] == g)[0]),
+        ("first(exp)", lambda g: tb.first(tb['grp'] == g)),
+        ("len(select(exp)) > 0", lambda g: len(tb.select(tb['grp'] == g)) > 0),
+        ("exists(exp)", lambda g: tb.exists(tb['grp'] == g)),
+    )
+
+    results = []
+    for name, func in cases:
+        seconds, _ = benchlib.timeit(repeat, func)
+        results.append((name, f"{seconds / LOOPS * 1000:.3f}"))
+
+    benchlib.report(f"{ROWS // GROUPS} matching rows of {ROWS}", results, ("pattern", "ms/call"))
+
+    db.cq.stop(wait=True)
+    benchlib.fresh_db(DB)
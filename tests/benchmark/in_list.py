@@ -0,0 +1,39 @@
+"""
+Benchmark: looking up rows by primary key with `in_()`, by the size of the list.
+Lists longer than the driver's `max_variables` are executed in chunks.
+"""
+import benchlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers import sqlite
+
+import random
+
+DB = 'in_list.db'
+ROWS = 200000
+SIZES = (10, 100, 1000, 10000, 50000, 100000)
+
+
+if __name__ == '__main__':
+    set_driver(sqlite)
+    benchlib.fresh_db(DB)
+
+    db = DataBase(DB)
+    tb = db.createTable('users')
+    tb.newColumn('id', int, primaryKey=True)
+    tb.newColumn('name', str)
+    tb.insert_many([(i, f"user{i}") for i in range(ROWS)], columns=['id', 'name'])
+
+    results = []
+    for size in SIZES:
+        ids = random.sample(range(ROWS), size)
+        seconds, res = benchlib.timeit(lambda: len(tb.select(tb['id'].in_(ids))))
+        assert res == size
+
+        chunks = len(tb['id'].in_(ids).split()) if size > sqlite.max_variables else 1
+        results.append((size, chunks, f"{seconds * 1000:.1f}", f"{size / seconds:.0f}"))
+
+    benchlib.report(f"select by `id IN (...)` from {ROWS} rows", results, ("ids", "chunks", "ms", "rows/s"))
+
+    db.cq.stop(wait=True)
+    benchlib.fresh_db(DB)
@@ -0,0 +1,47 @@
+"""
+Benchmark: opening a SQLite DB with many tables, and using a few of them.
+Tables are loaded lazily, so opening should not grow with the number of tables.
+"""
+import benchlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers import sqlite
+
+import sqlite3
+import tracemalloc
+
+DB = 'many_tables.db'
+TABLES = 10000
+USED = 5
+
+
+def make_db():
+    conn = sqlite3.connect(DB)
+    for i in range(TABLES):
+        conn.execute(f"CREATE TABLE t{i} (id INTEGER PRIMARY KEY, name TEXT, score REAL, created TEXT)")
+    conn.commit()
+    conn.close()
+
+
+if __name__ == '__main__':
+    set_driver(sqlite)
+    benchlib.fresh_db(DB)
+    make_db()
+
+    tracemalloc.start()
+    open_s, db = benchlib.timeit(DataBase, DB)
+    memory = tracemalloc.get_traced_memory()[0]
+    use_s, _ = benchlib.timeit(lambda: [db[f"t{i}"].columns for i in range(USED)])
+    tracemalloc.stop()
+
+    all_s, _ = benchlib.timeit(db.tables.load_all)
+
+    benchlib.report(f"{TABLES} tables", [
+        ("open", f"{open_s * 1000:.1f}"),
+        (f"first use of {USED} tables", f"{use_s * 1000:.1f}"),
+        ("load all the rest", f"{all_s * 1000:.1f}"),
+    ], ("step", "ms"))
+    print(f"memory after open: {memory / 2 ** 20:.2f} MiB")
+
+    db.cq.stop(wait=True)
+    benchlib.fresh_db(DB)
@@ -0,0 +1,71 @@
+"""
+Benchmark: the longest stall of a concurrent writer while `setPrimaryKey()` rebuilds the table,
+the old one-shot copy (`INSERT INTO ... SELECT *`) vs the online rebuild (chunked copy + triggers).
+"""
+import benchlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers import sqlite
+
+import threading
+import time
+
+DB = 'online_rebuild.db'
+ROWS = 500000
+CHUNK = 10000
+
+
+def prepare(db):
+    if 't' in db.tables:
+        db.deleteTable('t')
+    tb = db.createTable('t')
+    tb.newColumn('uid', int)
+    tb.newColumn('name', str)
+    tb.insert_many([(i, f"user{i}") for i in range(ROWS)], columns=['uid', 'name'])
+    return tb
+
+
+def with_writer(tb, func):
+    """
+    Run `func` while another thread keeps inserting, return `(seconds, longest stall, inserts)`.
+    """
+    stalls = []
+    stop = threading.Event()
+
+    def writer():
+        i = ROWS
+        while not stop.is_set():
+            start = time.perf_counter()
+            tb.insert(uid=i, name=f"user{i}")
+            stalls.append(time.perf_counter() - start)
+            i += 1
+
+    th = threading.Thread(target=writer)
+    th.start()
+    time.sleep(0.1)
+    seconds, _ = benchlib.timeit(func)
+    stop.set()
+    th.join()
+
+    return seconds, max(stalls), len(stalls)
+
+
+if __name__ == '__main__':
+    set_driver(sqlite)
+    benchlib.fresh_db(DB)
+    db = DataBase(DB)
+
+    results = []
+
+    tb = prepare(db)
+    seconds, stall, n = with_writer(tb, lambda: db.do(*sqlite.APIs.gensql.set_primary_key(tb, 'uid', 'INTEGER'), atomic=True))
+    results.append(("one-shot copy", f"{seconds:.2f}", f"{stall * 1000:.1f}", n))
+
+    tb = prepare(db)
+    seconds, stall, n = with_writer(tb, lambda: tb.setPrimaryKey('uid', 'INTEGER', chunk_size=CHUNK))
+    results.append((f"online, {CHUNK} rows/chunk", f"{seconds:.2f}", f"{stall * 1000:.1f}", n))
+
+    benchlib.report(f"setPrimaryKey() on {ROWS} rows, with a concurrent writer", results, ("method", "s", "max stall ms", "inserts"))
+
+    db.cq.stop(wait=True)
+    benchlib.fresh_db(DB)
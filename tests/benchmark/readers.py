@@ -0,0 +1,80 @@
+"""
+Benchmark: read throughput of the CommandQueue with N reader connections.
+
+8 threads run aggregate queries at the same time, while one thread keeps writing (its throughput is reported too,
+without readers its inserts wait behind the queries).
+Every query scans the whole table in SQLite (no index on `grp`), so the time is spent in SQLite
+(which releases the GIL) instead of Python, and the readers can run in parallel on multiple CPUs.
+"""
+import benchlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+
+import os
+import threading
+
+set_driver(Driver_SQLite)
+
+DB_FILE = 'bench_readers.db'
+ROWS = 200000
+THREADS = 8
+QUERIES = 20     # per thread
+GROUPS = 100
+
+
+def prepare():
+    benchlib.fresh_db(DB_FILE)
+    db = DataBase(DB_FILE)
+    tb = db['test']
+    tb.struct({'id': int, 'grp': int, 'name': str, 'score': float}, primaryKey='id')
+    tb.insert_many([(i, i % GROUPS, f"name{i}", i % 97) for i in range(ROWS)], columns=['id', 'grp', 'name', 'score'])
+    db.cq.stop(wait=True)
+
+
+def run(readers):
+    db = DataBase(DB_FILE, cq_ops={'readers': readers})
+    tb = db['test']
+    stop = False
+    inserts = [0]
+
+    def reader(k):
+        for i in range(QUERIES):
+            tb.avg('score', (tb['grp'] == (k * QUERIES + i) % GROUPS) & tb['name'].like('name1%'))
+
+    def writer():
+        while not stop:
+            tb.insert(name='new', score=0.0)
+            inserts[0] += 1
+
+    w = threading.Thread(target=writer)
+    w.start()
+
+    def all_readers():
+        ts = [threading.Thread(target=reader, args=(k,)) for k in range(THREADS)]
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+
+    seconds, _ = benchlib.timeit(all_readers)
+    stop = True
+    w.join()
+    db.cq.stop(wait=True)
+
+    return seconds, inserts[0]
+
+
+if __name__ == '__main__':
+    prepare()
+
+    rows = []
+    for readers in (0, 1, 2, 4, 8):
+        seconds, inserts = run(readers)
+        rows.append((readers, f"{seconds:.2f}", f"{THREADS * QUERIES / seconds:.1f}", f"{inserts / seconds:.1f}"))
+
+    benchlib.report(
+        f"Read throughput by reader count ({os.cpu_count()} CPUs)", rows,
+        ("readers", "seconds", "queries/s", "inserts/s"),
+    )
+    benchlib.fresh_db(DB_FILE)
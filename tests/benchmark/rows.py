@@ -0,0 +1,63 @@
+"""
+Benchmark: memory & iteration speed of result rows, `dict` (the old way) vs `QueryResultRow`.
+"""
+import benchlib
+
+from MercurySQL.gensql.row import QueryResultRow
+
+import time
+import tracemalloc
+
+ROWS = 200000
+COLUMNS = 12
+
+
+def make_rows():
+    return [tuple(i * COLUMNS + j for j in range(COLUMNS)) for i in range(ROWS)]
+
+
+def as_dicts(keys, values):
+    return [dict(zip(keys, row)) for row in values]
+
+
+def as_rows(keys, values):
+    index = {key: i for i, key in enumerate(keys)}
+    return [QueryResultRow(row, index) for row in values]
+
+
+def measure(build, keys, values):
+    tracemalloc.start()
+    rows = build(keys, values)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    total = 0
+    for row in rows:
+        total += row['col3'] + row['col7']
+    iterate = time.perf_counter() - start
+
+    return rows, memory, iterate
+
+
+if __name__ == '__main__':
+    keys = [f"col{j}" for j in range(COLUMNS)]
+    values = make_rows()
+
+    results = []
+    for name, build in (("dict", as_dicts), ("QueryResultRow", as_rows)):
+        seconds, (rows, memory, iterate) = benchlib.timeit(measure, build, keys, values)
+        results.append((
+            name,
+            f"{memory / ROWS:.0f}",
+            f"{memory / 2 ** 20:.1f}",
+            f"{(seconds - iterate) * 1000:.0f}",
+            f"{iterate * 1000:.0f}",
+        ))
+        del rows
+
+    benchlib.report(
+        f"{ROWS} rows x {COLUMNS} columns (memory excludes the fetched tuples)",
+        results,
+        ("row type", "bytes/row", "MiB", "build ms", "iterate ms"),
+    )
@@ -0,0 +1,50 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+if __name__ == '__main__':
+    db = DataBase("test.db")
+    db.do("CREATE TABLE test (id INTEGER, score REAL, day DATETIME, amount NUMERIC, flag BOOLEAN, n INTEGER)")
+    tb = db['test']
+    tb.insert_many(
+        [(1, 1.5, '2024-01-01', 10, True, 1), (2, None, '2024-01-02', 10.5, False, 'many'), (3, 3.0, None, 'n/a', None, 3)],
+        columns=['id', 'score', 'day', 'amount', 'flag', 'n'],
+    )
+
+    print("---", "select(format='columnar')")
+    for key, values in tb.select(format="columnar").items():
+        print(f"{key}:", type(values).__name__, getattr(values, 'dtype', ''), values.tolist() if hasattr(values, 'tolist') else values)
+
+    # the non-numeric value is in a later chunk
+    print("---", "to_columns(1)")
+    for key, values in tb.select().to_columns(1).items():
+            print(f"{key}:", type(values).__name__, getattr(values, 'dtype', ''), values.tolist() if hasattr(values, 'tolist') else values)
+
+    db.deleteTable('test')
+    db.cq.stop(wait=True)
+
+
+# <--- Check Test --->
+
+
+testlib.check(EXPECTED_OUTPUT = """
+--- select(format='columnar')
+id: ndarray int64 [1, 2, 3]
+score: ndarray float64 [1.5, nan, 3.0]
+day: list  ['2024-01-01', '2024-01-02', None]
+amount: list  [10, 10.5, 'n/a']
+flag: ndarray float64 [1.0, 0.0, nan]
+n: list  [1, 'many', 3]
+--- to_columns(1)
+id: ndarray int64 [1, 2, 3]
+score: ndarray float64 [1.5, nan, 3.0]
+day: list  ['2024-01-01', '2024-01-02', None]
+amount: list  [10, 10.5, 'n/a']
+flag: ndarray float64 [1.0, 0.0, nan]
+n: list  [1, 'many', 3]
+""")
@@ -0,0 +1,86 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+
+import io
+import sqlite3
+import sys
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+if __name__ == '__main__':
+    batches = []
+
+    def on_commit(n):
+        batches.append(n)
+        if len(batches) == 1:
+            raise RuntimeError("broken hook")
+
+    # errors of the hook are logged, the writer keeps running
+    sys.stderr, stderr = io.StringIO(), sys.stderr
+
+    db = DataBase("test.db", cq_ops={'group_commit': True, 'max_batch': 50, 'max_linger': 0.05, 'on_commit': on_commit})
+    test_table = db['test']
+    test_table.struct({'id': int, 'name': str}, primaryKey='id')
+
+    sql = "INSERT INTO test (id, name) VALUES (?, ?)"
+    futures = db.do_many_async(*[sql] * 200, paras=[(i, f"user{i}") for i in range(200)])
+    futures[-1].result()
+    sys.stderr, logged = stderr, sys.stderr.getvalue()
+    print("Hook error logged:", "broken hook" in logged)
+
+    # one commit covers many commands
+    print("Rows:", test_table.count())
+    print("Batched:", db.cq.stats['commits'] < db.cq.stats['commands'], max(batches) <= 50)
+
+    # a failed command doesn't fail the others of its batch
+    futures = db.do_many_async(sql, sql, sql, paras=[(1000, 'a'), (1000, 'b'), (1001, 'c')])
+    for f in futures:
+        print("Result:", type(f.exception()).__name__ if f.exception() else f.result())
+    print("Rows:", test_table.count())
+
+    # an error which rolls back the whole transaction fails the commands before it as well
+    db.do("CREATE TABLE strict (id INTEGER PRIMARY KEY ON CONFLICT ROLLBACK)")
+    strict = "INSERT INTO strict (id) VALUES (?)"
+    futures = db.do_many_async(strict, strict, strict, paras=[(1,), (1,), (2,)])
+    for f in futures:
+        print("Result:", type(f.exception()).__name__ if f.exception() else f.result())
+    print("Rows:", db.do("SELECT id FROM strict").fetchall())
+
+    db.cq.stop(wait=True)
+
+    # a failed commit is rolled back, not saved by the next one
+    db = DataBase("test.db", cq_ops={'group_commit': True}, timeout=0.2)
+    reader = sqlite3.connect("test.db", isolation_level=None)
+    reader.execute("BEGIN")
+    reader.execute("SELECT * FROM test").fetchall()
+    print("Locked:", type(db.do_many_async(sql, paras=[(2000, 'x')])[0].exception()).__name__)
+    reader.execute("COMMIT")
+    reader.close()
+    db.do(sql, paras=[(2001, 'y')])
+    print("Saved:", db.do("SELECT id FROM test WHERE id >= 2000").fetchall())
+
+    db.cq.stop(wait=True)
+
+
+# <--- Check Test --->
+
+
+testlib.check(EXPECTED_OUTPUT = """
+Hook error logged: True
+Rows: 200
+Batched: True True
+Result: []
+Result: IntegrityError
+Result: []
+Rows: 202
+Result: IntegrityError
+Result: IntegrityError
+Result: []
+Rows: [(2,)]
+Locked: OperationalError
+Saved: [(2001,)]
+""")
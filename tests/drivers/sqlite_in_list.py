@@ -0,0 +1,94 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+from MercurySQL.errors import NotSupportedError
+from MercurySQL.gensql.exp import _plans
+
+import sqlite3
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+ROWS = 100000
+
+
+class LimitedConnection(sqlite3.Connection):
+    """
+    A connection which allows exactly `max_variables` parameters, whatever SQLite is compiled with.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, Driver_SQLite.max_variables)
+
+
+def error(func):
+    try:
+        return func()
+    except Exception as e:
+        return type(e).__name__
+
+
+if __name__ == '__main__':
+    db = DataBase("test.db", factory=LimitedConnection)
+    tb = db['test']
+    tb.struct({'id': int, 'grp': int}, primaryKey='id')
+    tb.insert_many([(i, i % 10) for i in range(ROWS)], columns=['id', 'grp'])
+    limit = Driver_SQLite.max_variables
+
+    # small lists
+    print("3 ids:", len(tb.select(tb['id'].in_([1, 2, 3]))))
+    print("Duplicated ids:", len(tb.select(tb['id'].in_([1, 1, 2, 2, 2]))))
+    print("No ids:", len(tb.select(tb['id'].in_([]))))
+    print("With None:", len(tb.select(tb['id'].in_([1, None]))), len(tb.select(tb['id'].in_([1, None, tb['grp']]))))
+    print("With other conditions:", len(tb.select((tb['grp'] == 1) & tb['id'].in_(range(100)) & (tb['id'] > 50))))
+
+    # lists longer than the driver allows are split
+    ids = list(range(0, ROWS, 2)) + list(range(0, 1000))
+    exp = tb['id'].in_(ids) & (tb['grp'] < 5)
+    parts = exp.split()
+    print("Split:", len(parts) > 1, all(len(part.formula()[1]) <= limit for part in parts))
+    print("Split select:", len(tb.select(exp)), tb.count(exp))
+    print("Split aggregations:", tb.sum('id', exp), tb.min('id', exp), tb.max('id', exp), round(tb.avg('id', exp), 2))
+    print("Split exists:", tb.exists(exp), tb.exists(tb['id'].in_(range(-ROWS, 0))))
+    print("Split first:", tb.first(exp)['grp'] < 5, tb.first(tb['id'].in_(range(-ROWS, 0))))
+    print("Ordered:", error(lambda: len(tb.select(exp, order_by='id'))), error(lambda: tb.select(exp, batch_size=None, limit=10)))
+    print("Grouped:", error(lambda: tb.group_by('grp', exp).agg(n=('count', '*'))))
+
+    # lengths are padded to powers of two, so they share a few formulas
+    _plans.clear()
+    for n in range(1, 5000, 7):
+        (tb['id'].in_(range(n))).formula()
+    print("Plans for 715 lengths:", len(_plans))
+
+    # writes by huge lists
+    (tb['id'].in_(range(0, ROWS, 3))).update({'grp': -1})
+    print("Updated:", tb.count(tb['grp'] == -1))
+    (tb['id'].in_(range(0, ROWS, 3))).delete()
+    print("Left:", tb.count())
+
+    db.cq.stop(wait=True)
+
+
+# <--- Check Test --->
+
+
+testlib.check(EXPECTED_OUTPUT = """
+3 ids: 3
+Duplicated ids: 2
+No ids: 0
+With None: 1 10
+With other conditions: 5
+Split: True True
+Split select: 30200 30200
+Split aggregations: 1500009400 0 99994 49669.19
+Split exists: True False
+Split first: True None
+Ordered: NotSupportedError NotSupportedError
+Grouped: NotSupportedError
+Plans for 715 lengths: 12
+Updated: 33334
+Left: 66666
+""")
@@ -0,0 +1,47 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+from MercurySQL.errors import NotSupportedError
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+if __name__ == '__main__':
+    db = DataBase("test.db")
+    db.do("CREATE TABLE test (id INTEGER, email TEXT UNIQUE, city TEXT, age INTEGER, score REAL, PRIMARY KEY (id, city))")
+    tb = db['test']
+
+    print("Created:", tb.createIndex(['city', 'age'], include='score'))
+    print("Created:", tb.createIndex('age', unique=True, where=tb['age'] > 18))
+
+    # the included columns would be part of the unique key
+    try:
+        tb.createIndex('email', unique=True, include='score')
+    except NotSupportedError as e:
+        print("Error:", type(e).__name__)
+
+    # indexes of the constraints are not listed
+    for name, info in tb.indexes().items():
+        print(f"{name}:", info)
+
+    for name in tb.indexes():
+        tb.dropIndex(name)
+    print("Indexes:", tb.indexes())
+
+    db.deleteTable('test')
+    db.cq.stop(wait=True)
+
+
+# <--- Check Test --->
+
+
+testlib.check(EXPECTED_OUTPUT = """
+Created: idx_test_city_age
+Created: idx_test_age
+Error: NotSupportedError
+idx_test_age: {'columns': ['age'], 'unique': True, 'partial': True}
+idx_test_city_age: {'columns': ['city', 'age', 'score'], 'unique': False, 'partial': False}
+Indexes: {}
+""")
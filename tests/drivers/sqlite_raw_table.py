@@ -0,0 +1,47 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+from MercurySQL.errors import DuplicateError
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+if __name__ == '__main__':
+    db = DataBase("test.db")
+
+    # created by raw sql, not known by `db.tables`
+    db.do("CREATE TABLE raw (a INTEGER, b TEXT)")
+    db.do("INSERT INTO raw (a, b) VALUES (1, 'x')")
+    print("Known:", 'raw' in db.tables)
+
+    try:
+        db.createTable('raw')
+    except DuplicateError as e:
+        print("Error:", type(e).__name__)
+
+    raw = db['raw']
+    print("Columns:", raw.columns)
+    print("Rows:", [row.as_dict() for row in raw.select()])
+    raw['c'] = float
+    print("Columns:", raw.columns)
+
+    # a new table is still new
+    print("Columns of a new table:", db['new'].columns)
+
+    db.deleteTable('raw')
+    db.cq.stop(wait=True)
+
+
+# <--- Check Test --->
+
+
+testlib.check(EXPECTED_OUTPUT = """
+Known: False
+Error: DuplicateError
+Columns: ['a', 'b']
+Rows: [{'a': 1, 'b': 'x'}]
+Columns: ['a', 'b', 'c']
+Columns of a new table: []
+""")
@@ -0,0 +1,191 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+from MercurySQL.errors import ConfilictError
+
+import threading
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+ROWS = 5000
+
+
+def leftovers(db):
+    return db.do("SELECT type, name FROM sqlite_master WHERE name GLOB '___rebuild_*'").fetchall()
+
+
+def table_sql(db, name):
+    return db.do(f"SELECT sql FROM sqlite_master WHERE type = 'table' AND name = '{name}'").fetchone()[0]
+
+
+def error(func):
+    try:
+        func()
+    except Exception as e:
+        return type(e).__name__
+
+
+if __name__ == '__main__':
+    db = DataBase("test.db")
+
+    # --- concurrent writes during `setPrimaryKey()` ---
+    tb = db['test']
+    tb.newColumn('uid', int)
+    tb.newColumn('n', int)
+    tb.insert_many([(i, 0) for i in range(ROWS)], columns=['uid', 'n'])
+    tb.createIndex('n')
+    expected = {i: 0 for i in range(ROWS)}
+
+    def between_chunks(copied, total):
+        # runs between two chunks: rows already copied, and rows not copied yet
+        for uid in (copied - 1, total - 1 - copied):
+            if uid in expected:
+                (tb['uid'] == uid).update({'n': tb['n'] + 1})
+                expected[uid] += 1
+        uid = ROWS + copied
+        tb.insert(uid=uid, n=1)
+        expected[uid] = 1
+        (tb['uid'] == copied // 2).delete()
+        expected.pop(copied // 2, None)
+
+    stop = threading.Event()
+
+    def writer():
+        # another thread, on keys the callback doesn't touch
+        uid = 10 * ROWS
+        while not stop.is_set():
+            tb.insert(uid=uid, n=2)
+            (tb['uid'] == uid).update({'n': 3})
+            expected[uid] = 3
+            if uid % 3 == 0:
+                (tb['uid'] == uid).delete()
+                del expected[uid]
+            uid += 1
+
+    th = threading.Thread(target=writer)
+    th.start()
+    tb.setPrimaryKey('uid', 'INTEGER', chunk_size=500, progress=between_chunks)
+    stop.set()
+    th.join()
+
+    print("Primary key:", db.do(Driver_SQLite.APIs.gensql.get_primary_key('test')).fetchall())
+    print("Rows match:", {row['uid']: row['n'] for row in tb.select()} == expected)
+    print("Leftovers:", leftovers(db))
+    print("Indexes after setPrimaryKey:", sorted(tb.indexes()))
+
+    # --- duplicated keys ---
+    tb.newColumn('dup', int)
+    (tb['uid'] < 10).update({'dup': 1})
+    print("Duplicated:", error(lambda: tb.setPrimaryKey('dup', 'INTEGER', chunk_size=500)))
+    print("Leftovers:", leftovers(db))
+    print("Rows kept:", tb.count() == len(expected))
+    print("Primary key:", db.do(Driver_SQLite.APIs.gensql.get_primary_key('test')).fetchall())
+
+    # --- indexes ---
+    tb.createIndex(['dup', 'n'])
+    tb.delColumn('dup', chunk_size=500)
+    print("Indexes after delColumn:", sorted(tb.indexes()))
+    db.deleteTable('test')
+
+    # --- constraints ---
+    db.do("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+    db.do("INSERT INTO users (id) VALUES (1)")
+    db.do("""
+        CREATE TABLE c (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL UNIQUE,
+            age INTEGER DEFAULT 18 CHECK (age >= 0),
+            owner INTEGER REFERENCES users (id),
+            note TEXT,
+            a INTEGER,
+            b INTEGER,
+            CHECK (a < b)
+        )
+    """)
+    db.do("PRAGMA foreign_keys = ON")
+    c = db['c']
+    c.insert_many([(f"user{i}@x", i, 1, i, i + 1) for i in range(100)], columns=['email', 'age', 'owner', 'a', 'b'])
+    c.delete_many([100], key='id')
+
+    c.delColumn('note', chunk_size=30)
+    print(table_sql(db, 'c'))
+    print("Not null:", error(lambda: c.insert(age=1)))
+    print("Unique:", error(lambda: c.insert(email='user1@x')))
+    print("Check:", error(lambda: c.insert(email='new@x', age=-1)))
+    print("Foreign key:", error(lambda: c.insert(email='new@x', owner=2)))
+    c.insert(email='new@x')
+    print("Default & autoincrement:", tuple(c.first(c['email'] == 'new@x')[key] for key in ('id', 'age')))
+
+    # used by a table constraint, left to `ALTER TABLE ... DROP COLUMN`, which refuses it
+    print("Drop a:", error(lambda: c.delColumn('a')))
+    print("Columns:", db.do("SELECT name FROM pragma_table_info('c')").fetchall())
+
+    c.setPrimaryKey('email', 'TEXT', chunk_size=30)
+    print(table_sql(db, 'c'))
+    print("Rows:", c.count())
+    print("Leftovers:", leftovers(db))
+
+    db.do("PRAGMA foreign_keys = OFF")
+
+    # --- a new column as the primary key ---
+    k = db['k']
+    k['name'] = str
+    k['id'] = int, 'primary key'
+    print("New key:", k.columns, db.do(Driver_SQLite.APIs.gensql.get_primary_key('k')).fetchall())
+    k.insert(id=1, name='a')
+    k2 = db['k2']
+    k2['name'] = str
+    k2.insert(name='a')
+    k2.struct({'name': str, 'id': int}, primaryKey='id')
+    print("New key of a table with rows:", k2.columns, db.do(Driver_SQLite.APIs.gensql.get_primary_key('k2')).fetchall(), k2.count())
+
+    # --- triggers & views ---
+    db.do("CREATE TABLE log (id INTEGER)")
+    db.do("CREATE TRIGGER k_log AFTER INSERT ON k BEGIN INSERT INTO log (id) VALUES (NEW.id); END")
+    db.do("CREATE VIEW k_names AS SELECT id, name FROM k")
+    k['extra'] = int
+    k.delColumn('extra')
+    k.setPrimaryKey('name', 'TEXT')
+    k.insert(id=2, name='b')
+    print("Trigger:", db.do("SELECT id FROM log").fetchall())
+    print("View:", db.do("SELECT * FROM k_names ORDER BY id").fetchall())
+    print("Drop name:", error(lambda: k.delColumn('name')))
+    print("Leftovers:", leftovers(db), db.do("PRAGMA legacy_alter_table").fetchall())
+
+    db.cq.stop(wait=True)
+
+
+# <--- Check Test --->
+
+
+testlib.check(EXPECTED_OUTPUT = """
+Primary key: [('uid',)]
+Rows match: True
+Leftovers: []
+Indexes after setPrimaryKey: ['idx_test_n']
+Duplicated: ConfilictError
+Leftovers: []
+Rows kept: True
+Primary key: [('uid',)]
+Indexes after delColumn: ['idx_test_n']
+CREATE TABLE "c" (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT NOT NULL UNIQUE, age INTEGER DEFAULT 18 CHECK (age >= 0), owner INTEGER REFERENCES users (id), a INTEGER, b INTEGER, CHECK (a < b))
+Not null: IntegrityError
+Unique: IntegrityError
+Check: IntegrityError
+Foreign key: IntegrityError
+Default & autoincrement: (101, 18)
+Drop a: OperationalError
+Columns: [('id',), ('email',), ('age',), ('owner',), ('a',), ('b',)]
+CREATE TABLE "c" (id INTEGER, email TEXT NOT NULL UNIQUE PRIMARY KEY, age INTEGER DEFAULT 18 CHECK (age >= 0), owner INTEGER REFERENCES users (id), a INTEGER, b INTEGER, CHECK (a < b))
+Rows: 100
+Leftovers: []
+New key: ['name', 'id'] [('id',)]
+New key of a table with rows: ['name', 'id'] [('id',)] 1
+Trigger: [(2,)]
+View: [(1, 'a'), (2, 'b')]
+Drop name: OperationalError
+Leftovers: [] [(0,)]
+""")
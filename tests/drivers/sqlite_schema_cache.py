@@ -0,0 +1,61 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+
+import os
+import shutil
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+
+def make(path, table):
+    # the same statements, so all the files get the same `schema_version`
+    db = DataBase(path)
+    db.createTable(table).struct({"id": int, "v": str}, primaryKey="id")
+    db.cq.stop()
+
+
+def version(path):
+    db = DataBase(path)
+    res = db.do("PRAGMA schema_version;", readonly=True).fetchone()[0]
+    db.cq.stop()
+    return res
+
+
+def tables(path):
+    db = DataBase(path, schema_cache="test.schema.json")
+    res = {name: table.columns for name, table in db.tables.items()}
+    db.cq.stop()
+    return res
+
+
+make("test.db", "a")
+make("test_b.db", "b")
+make("test_c.db", "ccc")
+print("Same version:", version("test.db") == version("test_b.db") == version("test_c.db"))
+
+# the cache file is written by one DB, then used by another
+print("test.db:", tables("test.db"))
+print("Cached:", tables("test.db"))
+print("test_b.db:", tables("test_b.db"))
+
+# the file is replaced by another one
+print("test.db:", tables("test.db"))
+shutil.copyfile("test_c.db", "test.db")
+print("Replaced:", tables("test.db"))
+
+for path in ("test_b.db", "test_c.db", "test.schema.json"):
+    os.remove(path)
+
+
+testlib.check(EXPECTED_OUTPUT = """
+Same version: True
+test.db: {'a': ['id', 'v']}
+Cached: {'a': ['id', 'v']}
+test_b.db: {'b': ['id', 'v']}
+test.db: {'a': ['id', 'v']}
+Replaced: {'ccc': ['id', 'v']}
+""")
@@ -0,0 +1,132 @@
+import testlib
+
+from MercurySQL import DataBase, AsyncDataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+
+import asyncio
+import threading
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+
+def run(name, func):
+    """
+    Run `func` in a thread, report a deadlock instead of hanging the test.
+    """
+    res = []
+    t = threading.Thread(target=lambda: res.append(func()), daemon=True)
+    t.start()
+    t.join(timeout=30)
+    print(f"{name}:", "deadlock" if t.is_alive() else res[0])
+
+
+def write_while_streaming(tb):
+    # every row is updated while the result is still being iterated
+    for row in tb.select(batch_size=100):
+        (tb['id'] == row['id']).update({'n': tb['n'] + 1})
+    return tb.sum('n')
+
+
+def read_while_streaming(tb):
+    total = 0
+    for row in tb.select(batch_size=100):
+        total += tb.first(tb['id'] == row['id'])['n']
+    return total
+
+
+def break_early(tb):
+    for row in tb.select(batch_size=10):
+        break
+    tb.insert(id=1000, n=0)
+    return tb.count()
+
+
+async def async_write_while_streaming(atb):
+    async for row in atb.stream(chunk=100):
+        await atb.update(atb['id'] == row['id'], {'n': atb['n'] + 1})
+    return atb.table.sum('n')
+
+
+def nested_streams(tb):
+    # more streams at once than stream connections
+    total = 0
+    for a in tb.select(tb['id'] < 3, batch_size=1):
+        for b in tb.select(tb['id'] < 3, batch_size=1):
+            for c in tb.select(tb['id'] < 3, batch_size=1):
+                total += 1
+    return total
+
+
+def bounded_threads(tb):
+    before = threading.active_count()
+    for _ in range(100):
+        for row in tb.select(tb['id'] < 10, batch_size=5):
+            break
+    return threading.active_count() - before
+
+
+def lazy_by_default(tb):
+    res = tb.select()
+    tb.insert(id=2000, n=0)
+    return len(res)
+
+
+if __name__ == '__main__':
+    for name, cq_ops in (
+        ("writer only", {}),
+        ("group commit", {'group_commit': True, 'max_linger': 0.001}),
+        ("2 readers", {'readers': 2}),
+    ):
+        print(f"--- {name} ---")
+        db = DataBase("test.db", cq_ops=cq_ops)
+        tb = db['test']
+        tb.struct({'id': int, 'n': int}, primaryKey='id')
+        tb.insert_many([(i, 0) for i in range(500)], columns=['id', 'n'])
+
+        run("Write while streaming", lambda: write_while_streaming(tb))
+        run("Read while streaming", lambda: read_while_streaming(tb))
+        run("Break early, then write", lambda: break_early(tb))
+        run("Async write while streaming", lambda: asyncio.run(async_write_while_streaming(AsyncDataBase(db)['test'])))
+        run("Nested streams", lambda: nested_streams(tb))
+        run("New threads", lambda: bounded_threads(tb))
+        run("Lazy by default", lambda: lazy_by_default(tb))
+        print("Streamed rows:", sum(len(batch) for batch in tb.select(batch_size=64).iter_batches(64)))
+
+        db.deleteTable('test')
+        db.cq.stop(wait=True)
+
+
+# <--- Check Test --->
+
+
+testlib.check(EXPECTED_OUTPUT = """
+--- writer only ---
+Write while streaming: 500
+Read while streaming: 500
+Break early, then write: 501
+Async write while streaming: 1001
+Nested streams: 27
+New threads: 0
+Lazy by default: 502
+Streamed rows: 502
+--- group commit ---
+Write while streaming: 500
+Read while streaming: 500
+Break early, then write: 501
+Async write while streaming: 1001
+Nested streams: 27
+New threads: 0
+Lazy by default: 502
+Streamed rows: 502
+--- 2 readers ---
+Write while streaming: 500
+Read while streaming: 500
+Break early, then write: 501
+Async write while streaming: 1001
+Nested streams: 27
+New threads: 0
+Lazy by default: 502
+Streamed rows: 502
+""")
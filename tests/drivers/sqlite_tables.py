@@ -0,0 +1,44 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+
+def names(tables):
+    return sorted((name, type(table).__name__) for name, table in tables.items())
+
+
+db = DataBase("test.db")
+for name in ("a", "b", "c"):
+    db.createTable(name).struct({"id": int}, primaryKey="id")
+
+# tables are loaded when they're got, by any way
+db = DataBase("test.db")
+print("dict():", names(dict(db.tables)))
+
+db = DataBase("test.db")
+print("copy():", names(db.tables.copy()))
+
+db = DataBase("test.db")
+print("{**}:", names({**db.tables}))
+
+db = DataBase("test.db")
+print("pop():", type(db.tables.pop("a")).__name__, sorted(db.tables))
+print("get():", type(db.tables.get("b")).__name__, db.tables.get("x"))
+print("in:", "b" in db.tables, "a" in db.tables, len(db.tables))
+print("values():", sorted(type(t).__name__ for t in db.tables.values()))
+
+
+testlib.check(EXPECTED_OUTPUT = """
+dict(): [('a', 'Table'), ('b', 'Table'), ('c', 'Table')]
+copy(): [('a', 'Table'), ('b', 'Table'), ('c', 'Table')]
+{**}: [('a', 'Table'), ('b', 'Table'), ('c', 'Table')]
+pop(): Table ['b', 'c']
+get(): Table None
+in: True False 2
+values(): ['Table', 'Table']
+""")
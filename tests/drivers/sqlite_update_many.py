@@ -0,0 +1,53 @@
+import testlib
+
+from MercurySQL import DataBase, set_driver
+from MercurySQL.drivers.sqlite import Driver_SQLite
+from MercurySQL.errors import NotExistsError
+
+
+# Set the driver to Driver_SQLite
+set_driver(Driver_SQLite)
+
+if __name__ == '__main__':
+    db = DataBase("test.db")
+    tb = db['test']
+    tb.struct({'id': int, 'name': str, 'score': int}, primaryKey='id')
+    tb.createIndex('name', unique=True)
+    tb.insert_many([(i, f"user{i}", 0) for i in range(10)], columns=['id', 'name', 'score'])
+
+    # rows with different columns
+    print("Updated:", tb.update_many([{'id': 1, 'score': 90}, {'id': 2, 'name': 'two'}, {'id': 3, 'name': 'three', 'score': 70}]))
+    print("Rows:", [row.as_dict() for row in tb.select(tb['id'].in_([1, 2, 3]))])
+
+    # the second group breaks the unique index, the first one is rolled back as well
+    try:
+        tb.update_many([{'id': 4, 'score': 100}, {'id': 5, 'name': 'two'}])
+    except Exception as e:
+        print("Error:", type(e).__name__)
+    print("Score of 4:", tb.first(tb['id'] == 4)['score'])
+
+    # a row without the key
+    try:
+        tb.update_many([{'id': 6, 'score': 1}, {'score': 2}])
+    except NotExistsError as e:
+        print("Error:", type(e).__name__)
+    print("Score of 6:", tb.first(tb['id'] == 6)['score'])
+
+    print("Nothing:", tb.update_many([]), tb.update_many([{'id': 7}]), tb.update_many([{'id': 7}, {'id': 8, 'score': 5}]))
+
+    db.deleteTable('test')
+    db.cq.stop(wait=True)
+
+
+# <--- Check Test --->
+
+
+testlib.check(EXPECTED_OUTPUT = """
+Updated: 3
+Rows: [{'id': 1, 'name': 'user1', 'score': 90}, {'id': 2, 'name': 'two', 'score': 0}, {'id': 3, 'name': 'three', 'score': 70}]
+Error: IntegrityError
+Score of 4: 0
+Error: NotExistsError
+Score of 6: 0
+Nothing: 0 0 1
+""")